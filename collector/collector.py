@@ -40,6 +40,7 @@ class Collector:
         self.default_rss_refresh = COLLECTOR_CONFIG["rss_refresh"]
         self.data_source_methods = {"rss": self._collect_rss}
         self.seen = {}  # (task_id, source_url) -> set(entry_id)
+        self.active_tasks = set()  # task_ids currently being collected
 
     def run(self):
         """
@@ -75,12 +76,15 @@ class Collector:
 
     def _heartbeat_loop(self):
         """
-        Send HeartbeatRequest every configured interval.
+        Send HeartbeatRequest every configured interval, flagging
+        idle=True when no task is running so the dispatcher can queue us.
         """
         while True:
             ts = datetime.datetime.utcnow()
             try:
-                self.stub.Heartbeat(HeartbeatRequest(token=self.token, timestamp=ts))
+                self.stub.Heartbeat(HeartbeatRequest(
+                    token=self.token, timestamp=ts, idle=not self.active_tasks
+                ))
                 logger.debug("Heartbeat sent")
             except Exception as e:
                 logger.error(f"Heartbeat error: {e}")
@@ -105,19 +109,23 @@ class Collector:
         end_dt = assignment.end_time.ToDatetime().replace(tzinfo=datetime.timezone.utc)
         for src in assignment.sources:
             self.seen[(tid, src)] = set()
+        self.active_tasks.add(tid)
 
-        now = datetime.datetime.now(datetime.timezone.utc)
-        if now < start_dt:
-            wait = (start_dt - now).total_seconds()
-            logger.info(f"Task {tid}: waiting {wait:.1f}s until {start_dt}")
-            time.sleep(wait)
-
-        logger.info(f"Task {tid}: collecting until {end_dt}")
-        while datetime.datetime.now(datetime.timezone.utc) < end_dt:
-            for src in assignment.sources:
-                self.data_source_methods["rss"](tid, src)
-            time.sleep(self.default_rss_refresh)
-        logger.info(f"Task {tid}: complete")
+        try:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            if now < start_dt:
+                wait = (start_dt - now).total_seconds()
+                logger.info(f"Task {tid}: waiting {wait:.1f}s until {start_dt}")
+                time.sleep(wait)
+
+            logger.info(f"Task {tid}: collecting until {end_dt}")
+            while datetime.datetime.now(datetime.timezone.utc) < end_dt:
+                for src in assignment.sources:
+                    self.data_source_methods["rss"](tid, src)
+                time.sleep(self.default_rss_refresh)
+            logger.info(f"Task {tid}: complete")
+        finally:
+            self.active_tasks.discard(tid)
 
     def _collect_rss(self, task_id: str, source_url: str):
         """
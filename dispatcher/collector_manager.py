@@ -4,7 +4,8 @@ task assignments, and failover logic.
 """
 
 import threading, time
-from typing import Dict, List, Optional, Tuple, Any
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Any
 
 
 class CollectorInfo:
@@ -21,6 +22,7 @@ class CollectorInfo:
         self.tasks_completed_count: int = 0
         self.heartbeat_count: int = 0
         self.last_result_time: Optional[float] = None
+        self.idle_queued: bool = False
 
     def is_authenticated(self, token: str) -> bool:
         return self.token == token
@@ -67,9 +69,10 @@ class CollectorManager:
     Thread-safe manager for CollectorInfo objects, assignment, and failover.
     """
     def __init__(self):
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()  # re-entered by failover -> balanced assignment
         self._collectors: Dict[str, CollectorInfo] = {}
         self._tokens: Dict[str, str] = {}
+        self._idle_tokens: Deque[str] = deque()  # JIQ: tokens of collectors reporting idle
 
     def register_collector(self, name: str, secret: str) -> Tuple[bool, str]:
         """
@@ -96,17 +99,47 @@ class CollectorManager:
             self._tokens[token] = name
             return True, token, "Login successful"
 
-    def heartbeat(self, token: str, timestamp: Optional[float] = None) -> Tuple[bool, str]:
+    def heartbeat(
+        self, token: str, timestamp: Optional[float] = None, idle: bool = False
+    ) -> Tuple[bool, str]:
         """
         Record a heartbeat; returns False if token invalid.
+        An idle collector joins the idle queue (once) for JIQ assignment.
         """
         with self._lock:
             name = self._tokens.get(token)
             if not name or name not in self._collectors:
                 return False, "Invalid token"
-            self._collectors[name].record_heartbeat(timestamp)
+            info = self._collectors[name]
+            info.record_heartbeat(timestamp)
+            if idle and not info.idle_queued:
+                info.idle_queued = True
+                self._idle_tokens.append(token)
             return True, "Heartbeat recorded"
 
+    def pop_idle_collector(self, max_idle: float) -> Optional[CollectorInfo]:
+        """
+        Pop the oldest idle token (Join-the-Idle-Queue) and return its collector.
+        Tokens that went stale, were re-issued, or whose collector picked up
+        work since reporting idle are dropped on the way.
+        """
+        now = time.time()
+        with self._lock:
+            while True:
+                try:
+                    token = self._idle_tokens.popleft()
+                except IndexError:
+                    return None
+                info = self._collectors.get(self._tokens.get(token, ""))
+                if not info or info.token != token:
+                    continue
+                info.idle_queued = False
+                if info.assigned_tasks:
+                    continue
+                if not info.last_heartbeat or now - info.last_heartbeat > max_idle:
+                    continue
+                return info
+
     def choose_least_loaded_collector(self, max_idle: float) -> Optional[CollectorInfo]:
         """
         Return the active collector with fewest tasks.
@@ -135,15 +168,42 @@ class CollectorManager:
             return True, f"Task {task_id} assigned to {name}"
 
     def assign_task_balanced(
-        self, task_id: str, sources: List[str], end_time: float, max_idle: float
-    ) -> Tuple[bool, str]:
+        self, task_id: str, src_ids: List[str], end_time: float, max_idle: float
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Assign all sources of a task in one call and return
+        (assigned_ids, failed_ids).
         """
-        Choose least-loaded active collector and assign the task.
+        placement = self._place_sources(task_id, src_ids, end_time, max_idle)
+        placed = {s for srcs in placement.values() for s in srcs}
+        assigned = [s for s in src_ids if s in placed]
+        failed = [s for s in src_ids if s not in placed]
+        return assigned, failed
+
+    def _place_sources(
+        self, task_id: str, src_ids: List[str], end_time: float, max_idle: float
+    ) -> Dict[str, List[str]]:
         """
-        info = self.choose_least_loaded_collector(max_idle)
-        if not info or not info.token:
-            return False, "No available collectors"
-        return self.assign_task_to_collector(info.token, task_id, sources, end_time)
+        Give one source to each idle collector (JIQ) while tokens last, then
+        batch the remainder onto the least-loaded active collector (JSQ).
+        Returns collector name -> sources assigned to it.
+        """
+        placement: Dict[str, List[str]] = {}
+        remaining: List[str] = []
+        with self._lock:
+            for src in src_ids:
+                info = self.pop_idle_collector(max_idle)
+                if info:
+                    info.assign_task(task_id, [src], end_time)
+                    placement.setdefault(info.name, []).append(src)
+                else:
+                    remaining.append(src)
+            if remaining:
+                info = self.choose_least_loaded_collector(max_idle)
+                if info and info.token:
+                    info.assign_task(task_id, remaining, end_time)
+                    placement.setdefault(info.name, []).extend(remaining)
+        return placement
 
     def record_task_result(
         self, token: str, task_id: str, timestamp: Optional[float] = None
@@ -214,9 +274,9 @@ class CollectorManager:
                 self._tokens = {t: n for t, n in self._tokens.items() if n != name}
                 # Reassign its tasks
                 for tid, data in info.assigned_tasks.items():
-                    ok, msg = self.assign_task_balanced(
+                    placement = self._place_sources(
                         tid, data["sources"], data["end_time"], heartbeat_timeout
                     )
-                    if ok:
-                        results.append((name, tid, msg.split()[-1]))
+                    for new_name in placement:
+                        results.append((name, tid, new_name))
         return results
@@ -3,7 +3,8 @@ Dispatcher gRPC server: handles clients and collectors, persistent tasks,
 user management, and failover logic.
 """
 
-import grpc, time, datetime, traceback, json, uuid, threading, logging
+import grpc, time, datetime, json, uuid, threading, logging, queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict
 from concurrent import futures
 from collections import defaultdict
@@ -23,16 +24,23 @@ from proto.dispatcher_pb2_grpc import (
 
 from dispatcher.config import DISPATCHER_CONFIG
 from dispatcher.user_manager import UserManager
-from dispatcher.task_manager import TaskManager
+from dispatcher.task_manager import TaskManager, now_micros
 from dispatcher.collector_manager import CollectorManager
 from dispatcher.source_catalog import load_sources, list_available_categories, list_available_locations, match_sources
 
 # --- Logging Setup ---
+# Records go straight to the file handler until serve() swaps in the
+# QueueHandler. While serving, RPC threads still format each message (and
+# any traceback) in QueueHandler.prepare(); only the file I/O moves to the
+# listener thread.
 logger = logging.getLogger("Dispatcher")
 logger.setLevel(logging.DEBUG)
 fh = logging.FileHandler(DISPATCHER_CONFIG["log_file"])
 fh.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
 logger.addHandler(fh)
+log_queue = queue.SimpleQueue()
+log_handler = QueueHandler(log_queue)
+log_listener = QueueListener(log_queue, fh)
 
 
 def grpc_safe(f):
@@ -43,8 +51,7 @@ def grpc_safe(f):
         try:
             return f(self, request, context)
         except Exception as e:
-            logger.error(f"Exception in {f.__name__}: {e}")
-            traceback.print_exc()
+            logger.exception("Exception in %s: %s", f.__name__, e)
             context.set_details(str(e))
             context.set_code(grpc.StatusCode.INTERNAL)
             return None
@@ -71,7 +78,7 @@ class DispatcherService(ClientDispatcherServicer):
         Register a new client user.
         """
         ok, msg = self.user_manager.register_user(request.username, request.password)
-        logger.info(f"Register({request.username}) -> {ok}")
+        logger.info("Register(%s) -> %s", request.username, ok)
         return RegisterResponse(success=ok, message=msg)
 
     @grpc_safe
@@ -80,11 +87,11 @@ class DispatcherService(ClientDispatcherServicer):
         Authenticate a user and issue a session token.
         """
         if not self.user_manager.authenticate_user(request.username, request.password):
-            logger.warning(f"Login failed for {request.username}")
+            logger.warning("Login failed for %s", request.username)
             return LoginResponse(success=False, message="Invalid credentials", token="")
         token = uuid.uuid4().hex
         self._user_tokens[token] = request.username
-        logger.info(f"Login successful for {request.username}, token={token}")
+        logger.info("Login successful for %s, token=%s", request.username, token)
         return LoginResponse(success=True, message="Login successful", token=token)
 
     @grpc_safe
@@ -103,7 +110,6 @@ class DispatcherService(ClientDispatcherServicer):
         # Convert timestamps
         dt_start = request.start_time.ToDatetime().replace(tzinfo=datetime.timezone.utc)
         dt_end = request.end_time.ToDatetime().replace(tzinfo=datetime.timezone.utc)
-        iso_start, iso_end = dt_start.isoformat(), dt_end.isoformat()
         ts_end = dt_end.timestamp()
 
         task_id = uuid.uuid4().hex
@@ -113,28 +119,27 @@ class DispatcherService(ClientDispatcherServicer):
                 success=False,
                 message=f"No sources for {cats}/{locs}"
             )
-        self.task_manager.create_task(task_id, request.token, kw, cats, locs, iso_start, iso_end)
-
-        assigned, failed = [], []
-        for src in matched:
-            ok, msg = self.collector_manager.assign_task_balanced(
-                task_id, [src["id"]], ts_end, DISPATCHER_CONFIG["heartbeat_timeout"]
-            )
-            if ok:
-                assigned.append(src["id"])
-            else:
-                failed.append(src["id"])
-                logger.warning(f"Assign fail: {src['id']} -> {msg}")
+        now = now_micros()  # one clock read shared by the create and status writes
+        self.task_manager.create_task(task_id, request.token, kw, cats, locs, dt_start, dt_end, now)
+
+        # One call places every source: idle collectors first (JIQ),
+        # the remainder batched onto the least-loaded collector.
+        src_ids = [s["id"] for s in matched]
+        assigned, failed = self.collector_manager.assign_task_balanced(
+            task_id, src_ids, ts_end, DISPATCHER_CONFIG["heartbeat_timeout"]
+        )
+        if failed:
+            logger.warning("Assign fail: %s -> No available collectors", failed)
 
         if assigned:
-            self.task_manager.mark_dispatched(task_id)
-            logger.info(f"Task {task_id} dispatched to {len(assigned)} collectors")
+            self.task_manager.mark_dispatched(task_id, now)
+            logger.info("Task %s dispatched to %d collectors", task_id, len(assigned))
             message = f"Assigned {len(assigned)}/{len(matched)} sources"
             if failed:
                 message += "; failed: " + ",".join(failed)
             return TaskStartResponse(success=True, message=message, task_id=task_id)
         else:
-            self.task_manager.mark_failed(task_id)
+            self.task_manager.mark_failed(task_id, now)
             return TaskStartResponse(success=False, message="No collectors available", task_id="")
 
     @grpc_safe
@@ -156,7 +161,7 @@ class DispatcherService(ClientDispatcherServicer):
     @grpc_safe
     def ListAvailableCategories(self, request, context):
         """
-        Reload sources.json and return unique categories.
+        Return unique categories from the process-wide source catalog.
         """
         self.sources = load_sources("dispatcher/sources.json")
         cats = list_available_categories(self.sources)
@@ -186,20 +191,20 @@ class CollectorDispatcherService(CollectorDispatcherServicer):
     @grpc_safe
     def RegisterCollector(self, request, context):
         ok, msg = self.collector_manager.register_collector(request.name, request.secret)
-        logger.info(f"RegisterCollector({request.name}) -> {ok}")
+        logger.info("RegisterCollector(%s) -> %s", request.name, ok)
         return CollectorRegisterResponse(success=ok, message=msg)
 
     @grpc_safe
     def LoginCollector(self, request, context):
         ok, token, msg = self.collector_manager.login_collector(request.name, request.secret)
-        logger.info(f"LoginCollector({request.name}) -> {ok}, token={token}")
+        logger.info("LoginCollector(%s) -> %s, token=%s", request.name, ok, token)
         return CollectorLoginResponse(success=ok, token=token or "", message=msg)
 
     @grpc_safe
     def Heartbeat(self, request, context):
         ts = request.timestamp.ToDatetime().timestamp()
-        ok, msg = self.collector_manager.heartbeat(request.token, ts)
-        logger.debug(f"Heartbeat(token={request.token}) -> {ok}")
+        ok, msg = self.collector_manager.heartbeat(request.token, ts, idle=request.idle)
+        logger.debug("Heartbeat(token=%s, idle=%s) -> %s", request.token, request.idle, ok)
         return HeartbeatResponse(success=ok, message=msg)
 
     @grpc_safe
@@ -223,7 +228,7 @@ class CollectorDispatcherService(CollectorDispatcherServicer):
                 DISPATCHER_CONFIG["heartbeat_timeout"]
             )
             for dead_coll, task_id, new_coll in failures:
-                logger.warning(f"Collector '{dead_coll}' missed heartbeats; reassigned task {task_id} → {new_coll}")
+                logger.warning("Collector '%s' missed heartbeats; reassigned task %s → %s", dead_coll, task_id, new_coll)
 
             # 3) Stream each new assignment once
             info = self.collector_manager.get_collector_info(name)
@@ -273,12 +278,9 @@ def start_expiry_sweeper(task_manager, result_conds, interval=5):
     """
     def sweeper():
         while True:
-            now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
-            for task in task_manager.list_pending_or_dispatched():
-                if task["end_time"] <= now_iso:
-                    task_manager.mark_completed(task["task_id"])
-                    with result_conds[task["task_id"]]:
-                        result_conds[task["task_id"]].notify_all()
+            for task_id in task_manager.complete_expired(now_micros()):
+                with result_conds[task_id]:
+                    result_conds[task_id].notify_all()
             time.sleep(interval)
 
     threading.Thread(target=sweeper, daemon=True).start()
@@ -288,6 +290,10 @@ def serve():
     """
     Initialize managers, services, and gRPC server.
     """
+    log_listener.start()
+    logger.removeHandler(fh)
+    logger.addHandler(log_handler)
+
     # Shared managers & data
     task_manager = TaskManager(db_path=DISPATCHER_CONFIG["db_path"])
     collector_manager = CollectorManager()
@@ -308,8 +314,14 @@ def serve():
     server.add_insecure_port(f"[::]:{DISPATCHER_CONFIG['client_port']}")
     server.add_insecure_port(f"[::]:{DISPATCHER_CONFIG['collector_port']}")
     server.start()
-    logger.info(f"gRPC server listening on {DISPATCHER_CONFIG['client_port']} (client) and {DISPATCHER_CONFIG['collector_port']} (collector)")
-    server.wait_for_termination()
+    logger.info("gRPC server listening on %s (client) and %s (collector)",
+                DISPATCHER_CONFIG['client_port'], DISPATCHER_CONFIG['collector_port'])
+    try:
+        server.wait_for_termination()
+    finally:
+        logger.removeHandler(log_handler)
+        log_listener.stop() # drains the queue
+        logger.addHandler(fh)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
-import json
+import functools
+import mmap
+import os
+import orjson
 from typing import List, Dict, Set
 
 
@@ -6,6 +9,9 @@ def load_sources(filepath: str = "dispatcher/sources.json") -> List[Dict]:
     """
     Load the source catalog from a JSON file.
 
+    The parsed catalog is shared by every caller (do not mutate it) and is
+    only re-parsed when the file's modification time changes.
+
     Args:
         filepath (str): Path to the sources.json file.
 
@@ -17,8 +23,18 @@ def load_sources(filepath: str = "dispatcher/sources.json") -> List[Dict]:
             - categories (List[str]): List of category strings.
             - locations (List[str]): List of location strings.
     """
-    with open(filepath, 'r', encoding='utf-8') as f:
-        sources = json.load(f)
+    path = os.path.abspath(filepath)
+    return _load_sources_cached(path, os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_sources_cached(filepath: str, mtime_ns: int) -> List[Dict]:
+    # mtime_ns is only part of the cache key: an edited file misses the cache.
+    # Parse straight from the mapped pages rather than copying into a bytes object.
+    with open(filepath, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            memoryview(mm) as view:
+        sources = orjson.loads(view)
     return sources
 
 
@@ -1,57 +1,426 @@
 # dispatcher/task_manager.py
 
 import sqlite3
-import json
+from contextlib import contextmanager
+from functools import lru_cache
+import orjson
 import os
+import queue
 import datetime
-from typing import List, Optional, Dict, Tuple, Any
+import enum
+import pathlib
+import threading
+import time
+from typing import List, Optional, Dict, Tuple, Any, Union
+
+
+# categories/locations are stored as one string joined on the ASCII unit
+# separator, which never occurs in a tag; split() is all a read costs.
+LIST_SEP = "\x1f"
+
+# Per-connection settings, applied on every connect: fsync only at WAL
+# checkpoints, wait up to 5 s on a locked database, keep temp tables in RAM,
+# read pages through a 256 MiB memory map instead of read() calls, and keep
+# up to ~20 MB of pages in the connection's own cache.
+CONNECTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+    "cache_size": -20000,
+}
+
+# sqlite3 caches compiled statements per connection, keyed on the exact SQL
+# text; the fixed statements below are shared constants so every call hits it.
+STATEMENT_CACHE_SIZE = 256
+
+# UPDATE ... RETURNING needs SQLite 3.35+; older builds re-read the row instead.
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Stored in PRAGMA user_version.  0: times held as ISO-8601 TEXT;
+# 1: times held as INTEGER microseconds since the Unix epoch (UTC);
+# 2: tables keyed WITHOUT ROWID, so a primary-key lookup is one B-tree descent;
+# 3: status held as a Status code instead of its name;
+# 4: categories/locations always LIST_SEP-joined (rows written before the
+#    packed format held JSON arrays).
+SCHEMA_VERSION = 4
+
+
+class Status(enum.IntEnum):
+    """Task states, stored in the tasks.status column as their integer value."""
+    PENDING = 0
+    DISPATCHED = 1
+    COMPLETED = 2
+    FAILED = 3
+    CANCELLED = 4
+
+
+# Reads hand back the name, so callers keep comparing against "PENDING" etc.
+_STATUS_NAMES = tuple(status.name for status in Status)
+
+_TASKS_DDL = """
+    CREATE TABLE IF NOT EXISTS tasks (
+      task_id      TEXT PRIMARY KEY,
+      token        TEXT    NOT NULL,
+      keywords     TEXT    NOT NULL,
+      categories   TEXT    NOT NULL,
+      locations    TEXT    NOT NULL,
+      start_time   INTEGER NOT NULL,
+      end_time     INTEGER NOT NULL,
+      status       INTEGER NOT NULL DEFAULT 0,
+      created_at   INTEGER NOT NULL,
+      updated_at   INTEGER NOT NULL
+    ) WITHOUT ROWID
+"""
+
+_TASK_CATEGORIES_DDL = """
+    CREATE TABLE IF NOT EXISTS task_categories (
+      task_id  TEXT NOT NULL,
+      cat      TEXT NOT NULL,
+      PRIMARY KEY (task_id, cat)
+    ) WITHOUT ROWID
+"""
+
+# The whole schema in one script, so a new database is set up in a single
+# executescript() call; list_tasks filters on status or token and orders by
+# created_at, and list_tasks(category=...) looks up task_categories by cat.
+_SCHEMA_DDL = f"""
+    BEGIN IMMEDIATE;
+    {_TASKS_DDL};
+    {_TASK_CATEGORIES_DDL};
+    CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, created_at);
+    CREATE INDEX IF NOT EXISTS idx_tasks_token ON tasks(token, created_at);
+    CREATE INDEX IF NOT EXISTS idx_tc_cat ON task_categories(cat);
+    PRAGMA user_version = {SCHEMA_VERSION};
+    COMMIT;
+"""
+
+_SQL_INSERT_TASK = """
+    INSERT INTO tasks
+    (task_id, token, keywords, categories, locations, start_time, end_time, status, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+"""
+_SQL_UPDATE_STATUS = "UPDATE tasks SET status = ?, updated_at = ? WHERE task_id = ?"
+_SQL_UPDATE_STATUS_RETURNING = _SQL_UPDATE_STATUS + " RETURNING *"
+_SQL_GET_TASK = "SELECT * FROM tasks WHERE task_id = ?"
+_SQL_EXPIRED = f"""
+    SELECT task_id FROM tasks
+    WHERE status IN ({Status.PENDING:d}, {Status.DISPATCHED:d}) AND end_time <= ?
+"""
+_SQL_COMPLETE_EXPIRED = f"""
+    UPDATE tasks SET status = {Status.COMPLETED:d}, updated_at = ?
+    WHERE status IN ({Status.PENDING:d}, {Status.DISPATCHED:d}) AND end_time <= ?
+    RETURNING task_id
+"""
+_SQL_COUNT_TASKS = "SELECT COUNT(*) FROM tasks"
+_SQL_INSERT_CATEGORY = "INSERT OR IGNORE INTO task_categories (task_id, cat) VALUES (?, ?)"
+
+
+@lru_cache(maxsize=None)
+def _status_in(n: int) -> str:
+    """`status IN (?,...)` with `n` placeholders, built once per arity."""
+    return "status IN ({})".format(",".join("?" * n))
+
+
+@lru_cache(maxsize=64)
+def _list_sql(by_token: bool, by_category: bool, n_statuses: int, by_time: bool,
+              limit: bool, offset: bool) -> str:
+    """
+    SQL for one shape of `list_tasks` filters.  Memoized so a repeated
+    shape reuses the identical string, and with it the cached statement.
+    """
+    sql = ["SELECT * FROM tasks"]
+    clauses = []
+    if by_token:
+        clauses.append("token = ?")
+    if by_category:
+        clauses.append("task_id IN (SELECT task_id FROM task_categories WHERE cat = ?)")
+    if n_statuses:
+        clauses.append(_status_in(n_statuses))
+    if by_time:
+        clauses.append("start_time >= ? AND start_time <= ?")
+
+    if clauses:
+        sql.append("WHERE " + " AND ".join(clauses))
+    sql.append("ORDER BY created_at DESC")
+
+    if limit:
+        sql.append("LIMIT ?")
+    if offset:
+        sql.append("OFFSET ?")
+    return " ".join(sql)
+
+
+# The canonical statuses fit in 8 placeholders; build those up front.
+for _n in range(1, 9):
+    _status_in(_n)
+
+
+# A time accepted by TaskManager: ISO-8601 string, datetime (naive = UTC),
+# or an int of microseconds since the epoch.
+Timestamp = Union[str, datetime.datetime, int]
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def now_micros() -> int:
+    """
+    Current time as microseconds since the Unix epoch, the form TaskManager
+    stores; pass it as `now` to share one clock read across calls.
+    """
+    return time.time_ns() // 1000
+
+
+def _to_micros(value: Timestamp) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+@lru_cache(maxsize=4096)
+def _to_iso(micros: int) -> str:
+    # Cached: a batch of tasks shares its created/start/end times
+    return (_EPOCH + datetime.timedelta(microseconds=micros)).isoformat()
+
+
+def _unpack_list(value: str) -> List[str]:
+    return value.split(LIST_SEP) if value else []
+
+
+def _repack_json_list(value: str) -> str:
+    """
+    A list column from before schema version 4, LIST_SEP-joined.  Only
+    migration looks at the content: a JSON array of strings is a legacy
+    row, anything else is already packed.
+    """
+    if value[:1] == "[":
+        try:
+            items = orjson.loads(value)
+        except orjson.JSONDecodeError:
+            return value
+        if isinstance(items, list) and all(isinstance(item, str) for item in items):
+            return LIST_SEP.join(items)
+    return value
+
+
+def _v0_row_to_micros(row: Tuple) -> Tuple:
+    """A schema-version-0 tasks row with its ISO-8601 times as micros."""
+    return row[:5] + (_to_micros(row[5]), _to_micros(row[6]), row[7],
+                      _to_micros(row[8]), _to_micros(row[9]))
+
+
+def _status_code(status: Union[str, int]) -> int:
+    """The stored code for a status given by name ("PENDING") or Status."""
+    if isinstance(status, str):
+        try:
+            return Status[status].value
+        except KeyError:
+            raise ValueError(f"unknown status {status!r}") from None
+    return Status(status).value
+
+
+def _row_to_dict(row: Tuple) -> Dict[str, Any]:
+    return {
+        "task_id":    row[0],
+        "token":      row[1],
+        "keywords":   row[2],
+        "categories": _unpack_list(row[3]),
+        "locations":  _unpack_list(row[4]),
+        "start_time": _to_iso(row[5]),
+        "end_time":   _to_iso(row[6]),
+        "status":     _STATUS_NAMES[row[7]],
+        "created_at": _to_iso(row[8]),
+        "updated_at": _to_iso(row[9]),
+    }
+
 
 class TaskManager:
-    """Persistent store for TaskRequest metadata and status."""
+    """
+    Persistent store for TaskRequest metadata and status.  Writes go through
+    one autocommit connection, serialized by a lock; reads on a file
+    database check out read-only connections from a pool, so over WAL they
+    never wait on the writer.  `:memory:` databases are private to their
+    connection, so there every call uses the writer.
+    """
 
-    def __init__(self, db_path: str = "dispatcher/tasks.db"):
+    def __init__(self, db_path: str = "dispatcher/tasks.db",
+                 pragmas: Optional[Dict[str, Any]] = None):
         """
         Open or create the tasks database.  If the existing file is not a valid
         SQLite database (corrupted or truncated), delete it and start fresh.
+        `pragmas` replaces CONNECTION_PRAGMAS, e.g. to benchmark other settings.
         """
+        pragmas = dict(CONNECTION_PRAGMAS if pragmas is None else pragmas)
+        journal_mode = pragmas.pop("journal_mode", None)
+        self._pragmas = tuple(f"PRAGMA {name}={value}" for name, value in pragmas.items())
+        self._write_lock = threading.RLock()
+        self._txn_owner = None # thread id inside `transaction`, if any
+        self._read_pool = None
         need_init = not os.path.exists(db_path)
         # Attempt to open an existing database
         try:
-            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn = self._connect(db_path)
             if not need_init:
                 # Probe the schema; will raise DatabaseError if file is invalid
-                self.conn.execute("PRAGMA schema_version;")
+                self._conn.execute("PRAGMA schema_version;")
         except sqlite3.DatabaseError:
             # Corrupted database: remove file and recreate
             try:
-                self.conn.close()
+                self._conn.close()
             except Exception:
                 pass
             os.remove(db_path)
-            self.conn = sqlite3.connect(db_path, check_same_thread=False)
-            need_init = True
-
-        if need_init:
-            # Create the tasks table from scratch
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS tasks (
-                  task_id      TEXT PRIMARY KEY,
-                  token        TEXT    NOT NULL,
-                  keywords     TEXT    NOT NULL,
-                  categories   TEXT    NOT NULL,
-                  locations    TEXT    NOT NULL,
-                  start_time   TEXT    NOT NULL,
-                  end_time     TEXT    NOT NULL,
-                  status       TEXT    NOT NULL,
-                  created_at   TEXT    NOT NULL,
-                  updated_at   TEXT    NOT NULL
-                )
-            """)
-            # You may also want to insert an index on status or timestamps here
-            self.conn.commit()
-
-    def _now(self) -> str:
-        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+            self._conn = self._connect(db_path)
+
+        for pragma in self._pragmas:
+            self._conn.execute(pragma)
+        if db_path != ":memory:" and journal_mode is not None:
+            # Set on every open: the file may have been replaced since the
+            # last one, and on a database already in WAL this is a no-op.
+            self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+
+        self._ensure_schema()
+
+        if db_path != ":memory:":
+            self._reader_uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+            self._read_pool = queue.SimpleQueue() # idle read-only connections
+
+    def _ensure_schema(self) -> None:
+        """
+        Create the tables and indexes, migrating a database from an older
+        SCHEMA_VERSION.  A database already at SCHEMA_VERSION was set up by
+        _SCHEMA_DDL, so opening it costs one PRAGMA read.
+        """
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        if self._table_exists("tasks"):
+            self._migrate(version)
+        with self._write_lock:
+            self._conn.executescript(_SCHEMA_DDL)
+
+    def _table_exists(self, name: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    def _migrate(self, version: int) -> None:
+        """Bring a database at schema `version` up to SCHEMA_VERSION."""
+        def convert(row: Tuple) -> Tuple:
+            if version < 1:
+                # Version 0 held ISO-8601 TEXT times
+                row = _v0_row_to_micros(row)
+            if version < 3:
+                # Versions before 3 held the status name
+                row = row[:7] + (_status_code(row[7]),) + row[8:]
+            return row[:3] + (_repack_json_list(row[3]), _repack_json_list(row[4])) + row[5:]
+
+        with self.transaction():
+            self._rebuild_table("tasks", _TASKS_DDL, convert)
+            if not self._table_exists("task_categories"):
+                # One row per (task, category); backfill from tasks written
+                # before the table existed
+                self._conn.execute(_TASK_CATEGORIES_DDL)
+                self._conn.executemany(_SQL_INSERT_CATEGORY, [
+                    (task_id, cat)
+                    for task_id, categories in self._conn.execute("SELECT task_id, categories FROM tasks")
+                    for cat in _unpack_list(categories)
+                ])
+            elif version < 2:
+                self._rebuild_table("task_categories", _TASK_CATEGORIES_DDL)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _rebuild_table(self, name: str, ddl: str, convert=None) -> bool:
+        """
+        Recreate an existing table `name` from `ddl`, copying its rows (through
+        `convert`, if given).  Returns False if there was no such table.
+        """
+        if not self._table_exists(name):
+            return False
+        self._conn.execute(f"ALTER TABLE {name} RENAME TO {name}_old")
+        self._conn.execute(ddl)
+        if convert is None:
+            self._conn.execute(f"INSERT INTO {name} SELECT * FROM {name}_old")
+        else:
+            cursor = self._conn.execute(f"SELECT * FROM {name}_old")
+            placeholders = ", ".join("?" * len(cursor.description))
+            self._conn.executemany(f"INSERT INTO {name} VALUES ({placeholders})", map(convert, cursor.fetchall()))
+        self._conn.execute(f"DROP TABLE {name}_old") # and its indexes
+        return True
+
+    def truncate_all(self) -> None:
+        """Delete every task, keeping the schema (used to reset test databases)."""
+        with self.transaction():
+            self._conn.execute("DELETE FROM task_categories")
+            self._conn.execute("DELETE FROM tasks")
+
+    def close(self) -> None:
+        """Close all database connections; the instance is unusable afterwards."""
+        pool, self._read_pool = self._read_pool, None
+        while pool is not None and not pool.empty():
+            pool.get_nowait().close()
+        self._conn.close()
+
+    def __del__(self):
+        if getattr(self, "_conn", None) is not None:
+            self.close()
+
+    @contextmanager
+    def _reader(self):
+        """
+        Yield a connection for a read.  Reads made inside this thread's own
+        transaction use the writer so they see its uncommitted changes.
+        """
+        pool = self._read_pool
+        if pool is None or self._txn_owner == threading.get_ident():
+            with self._write_lock:
+                yield self._conn
+            return
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(self._reader_uri, uri=True, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            for pragma in self._pragmas:
+                conn.execute(pragma)
+        try:
+            yield conn
+        finally:
+            pool.put(conn)
+
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        return sqlite3.connect(db_path, isolation_level=None, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several calls into one write transaction (a single commit and
+        fsync).  Rolls back if the block raises; nested use joins the
+        outer transaction.
+        """
+        with self._write_lock:
+            if self._conn.in_transaction:
+                yield
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._txn_owner = threading.get_ident()
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._txn_owner = None
 
     def create_task(self,
                     task_id: str,
@@ -59,128 +428,146 @@ class TaskManager:
                     keywords: str,
                     categories: List[str],
                     locations: List[str],
-                    start_time: str,
-                    end_time: str) -> None:
-        """Insert a new task in PENDING state."""
-        now = self._now()
-        self.conn.execute("""
-            INSERT INTO tasks
-            (task_id, token, keywords, categories, locations, start_time, end_time, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'PENDING', ?, ?)
-        """, (
-            task_id,
-            token,
-            keywords,
-            json.dumps(categories),
-            json.dumps(locations),
-            start_time,
-            end_time,
-            now,
-            now
-        ))
-        self.conn.commit()
-
-    def update_status(self, task_id: str, new_status: str) -> None:
-        """Change the task’s status (e.g. DISPATCHED, COMPLETED, FAILED)."""
-        now = self._now()
-        self.conn.execute("""
-            UPDATE tasks
-            SET status = ?, updated_at = ?
-            WHERE task_id = ?
-        """, (new_status, now, task_id))
-        self.conn.commit()
-
-    def mark_dispatched(self, task_id: str) -> None:
-        self.update_status(task_id, "DISPATCHED")
-
-    def mark_completed(self, task_id: str) -> None:
-        self.update_status(task_id, "COMPLETED")
-
-    def mark_failed(self, task_id: str) -> None:
-        self.update_status(task_id, "FAILED")
-
-    def cancel_task(self, task_id: str) -> None:
+                    start_time: Timestamp,
+                    end_time: Timestamp,
+                    now: Optional[Timestamp] = None) -> None:
+        """
+        Insert a new task in PENDING state.  Pass `now` to reuse a timestamp
+        already computed for this request instead of reading the clock again.
+        """
+        now = _to_micros(now) if now else now_micros()
+        with self.transaction():
+            self._conn.execute(_SQL_INSERT_TASK, (
+                task_id,
+                token,
+                keywords,
+                LIST_SEP.join(categories),
+                LIST_SEP.join(locations),
+                _to_micros(start_time),
+                _to_micros(end_time),
+                now,
+                now
+            ))
+            self._conn.executemany(_SQL_INSERT_CATEGORY, [(task_id, cat) for cat in categories])
+
+    def create_many(self,
+                    tasks: List[Tuple[str, str, str, List[str], List[str], Timestamp, Timestamp]],
+                    now: Optional[Timestamp] = None) -> None:
+        """
+        Insert many tasks in PENDING state in one transaction.  Each item is
+        (task_id, token, keywords, categories, locations, start_time, end_time).
+        """
+        now = _to_micros(now) if now else now_micros()
+        rows = [
+            (task_id, token, keywords, LIST_SEP.join(categories), LIST_SEP.join(locations),
+             _to_micros(start_time), _to_micros(end_time), now, now)
+            for task_id, token, keywords, categories, locations, start_time, end_time in tasks
+        ]
+        with self.transaction():
+            self._conn.executemany(_SQL_INSERT_TASK, rows)
+            self._conn.executemany(_SQL_INSERT_CATEGORY, [
+                (task[0], cat) for task in tasks for cat in task[3]
+            ])
+
+    def update_status(self, task_id: str, new_status: Union[str, Status],
+                      now: Optional[Timestamp] = None) -> Optional[Dict[str, Any]]:
+        """
+        Change the task’s status (e.g. DISPATCHED, COMPLETED, FAILED) and
+        return the updated task, or None if there is no such task.
+        """
+        new_status = _status_code(new_status)
+        now = _to_micros(now) if now else now_micros()
+        with self._write_lock:
+            if HAS_RETURNING:
+                # fetchall() runs the statement to completion so autocommit can commit
+                rows = self._conn.execute(_SQL_UPDATE_STATUS_RETURNING, (new_status, now, task_id)).fetchall()
+            else:
+                self._conn.execute(_SQL_UPDATE_STATUS, (new_status, now, task_id))
+                rows = self._conn.execute(_SQL_GET_TASK, (task_id,)).fetchall()
+        return _row_to_dict(rows[0]) if rows else None
+
+    def mark_many(self, task_ids: List[str], new_status: Union[str, Status],
+                  now: Optional[Timestamp] = None) -> None:
+        """Set the same status on many tasks in one transaction."""
+        new_status = _status_code(new_status)
+        now = _to_micros(now) if now else now_micros()
+        with self.transaction():
+            self._conn.executemany(_SQL_UPDATE_STATUS, [(new_status, now, task_id) for task_id in task_ids])
+
+    def complete_expired(self, now: Optional[Timestamp] = None) -> List[str]:
+        """
+        Mark every PENDING or DISPATCHED task whose end_time has passed as
+        COMPLETED, comparing stored micros directly, and return their IDs.
+        """
+        now = _to_micros(now) if now else now_micros()
+        with self._write_lock:
+            if HAS_RETURNING:
+                rows = self._conn.execute(_SQL_COMPLETE_EXPIRED, (now, now)).fetchall()
+            else:
+                with self.transaction():
+                    rows = self._conn.execute(_SQL_EXPIRED, (now,)).fetchall()
+                    self._conn.executemany(_SQL_UPDATE_STATUS,
+                                           [(Status.COMPLETED.value, now, task_id) for task_id, in rows])
+        return [task_id for task_id, in rows]
+
+    def mark_dispatched(self, task_id: str, now: Optional[Timestamp] = None) -> Optional[Dict[str, Any]]:
+        return self.update_status(task_id, Status.DISPATCHED, now)
+
+    def mark_completed(self, task_id: str, now: Optional[Timestamp] = None) -> Optional[Dict[str, Any]]:
+        return self.update_status(task_id, Status.COMPLETED, now)
+
+    def mark_failed(self, task_id: str, now: Optional[Timestamp] = None) -> Optional[Dict[str, Any]]:
+        return self.update_status(task_id, Status.FAILED, now)
+
+    def cancel_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Soft-cancel a task."""
-        self.update_status(task_id, "CANCELLED")
+        return self.update_status(task_id, Status.CANCELLED)
 
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Fetch a single task by ID, or None if not found."""
-        row = self.conn.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        with self._reader() as conn:
+            row = conn.execute(_SQL_GET_TASK, (task_id,)).fetchone()
         if not row:
             return None
-        return {
-            "task_id":    row[0],
-            "token":      row[1],
-            "keywords":   row[2],
-            "categories": json.loads(row[3]),
-            "locations":  json.loads(row[4]),
-            "start_time": row[5],
-            "end_time":   row[6],
-            "status":     row[7],
-            "created_at": row[8],
-            "updated_at": row[9],
-        }
+        return _row_to_dict(row)
 
     def list_tasks(self,
                    token: Optional[str] = None,
-                   statuses: Optional[List[str]] = None,
-                   time_range: Optional[Tuple[str, str]] = None,
+                   statuses: Optional[List[Union[str, Status]]] = None,
+                   time_range: Optional[Tuple[Timestamp, Timestamp]] = None,
                    limit: Optional[int] = None,
-                   offset: Optional[int] = None
+                   offset: Optional[int] = None,
+                   category: Optional[str] = None
                   ) -> List[Dict[str, Any]]:
         """
         List tasks, optionally filtered by:
           - token
+          - category (any of the task's categories)
           - one or more statuses
           - start_time between time_range[0] and time_range[1]
         Supports pagination via limit/offset.
         """
-        sql = ["SELECT * FROM tasks"]
         args: List[Any] = []
-
-        clauses = []
         if token:
-            clauses.append("token = ?")
             args.append(token)
+        if category:
+            args.append(category)
         if statuses:
-            clauses.append(
-                "status IN ({})".format(",".join("?"*len(statuses)))
-            )
-            args.extend(statuses)
+            args.extend(map(_status_code, statuses))
         if time_range:
-            clauses.append("start_time >= ? AND start_time <= ?")
-            args.extend([time_range[0], time_range[1]])
-
-        if clauses:
-            sql.append("WHERE " + " AND ".join(clauses))
-        sql.append("ORDER BY created_at DESC")
-
+            args.extend([_to_micros(time_range[0]), _to_micros(time_range[1])])
         if limit is not None:
-            sql.append("LIMIT ?")
             args.append(limit)
         if offset is not None:
-            sql.append("OFFSET ?")
             args.append(offset)
 
-        cursor = self.conn.execute(" ".join(sql), tuple(args))
-        rows = cursor.fetchall()
-        tasks = []
-        for row in rows:
-            tasks.append({
-                "task_id":    row[0],
-                "token":      row[1],
-                "keywords":   row[2],
-                "categories": json.loads(row[3]),
-                "locations":  json.loads(row[4]),
-                "start_time": row[5],
-                "end_time":   row[6],
-                "status":     row[7],
-                "created_at": row[8],
-                "updated_at": row[9],
-            })
-        return tasks
-
-    def list_tasks_by_status(self, statuses: List[str]) -> List[Dict[str, Any]]:
+        sql = _list_sql(bool(token), bool(category), len(statuses or ()), bool(time_range),
+                        limit is not None, offset is not None)
+        with self._reader() as conn:
+            rows = conn.execute(sql, tuple(args)).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def list_tasks_by_status(self, statuses: List[Union[str, Status]]) -> List[Dict[str, Any]]:
         """Shortcut for listing by status."""
         return self.list_tasks(statuses=statuses)
 
@@ -188,19 +575,20 @@ class TaskManager:
         """
         For resuming on startup: tasks still PENDING or DISPATCHED.
         """
-        return self.list_tasks(statuses=["PENDING", "DISPATCHED"])
+        return self.list_tasks(statuses=[Status.PENDING, Status.DISPATCHED])
 
     def count_tasks(self,
-                    statuses: Optional[List[str]] = None
+                    statuses: Optional[List[Union[str, Status]]] = None
                    ) -> int:
         """
         Return the number of tasks, optionally filtered by status.
         """
         if statuses:
-            sql = "SELECT COUNT(*) FROM tasks WHERE status IN ({})".format(",".join("?"*len(statuses)))
-            args = statuses
+            sql = _SQL_COUNT_TASKS + " WHERE " + _status_in(len(statuses))
+            args = [_status_code(status) for status in statuses]
         else:
-            sql = "SELECT COUNT(*) FROM tasks"
+            sql = _SQL_COUNT_TASKS
             args = []
-        row = self.conn.execute(sql, tuple(args)).fetchone()
+        with self._reader() as conn:
+            row = conn.execute(sql, tuple(args)).fetchone()
         return row[0] if row else 0
@@ -1,25 +1,125 @@
 import asyncio
-import json
 import logging
-from typing import Dict, Any
-from aiohttp import ClientSession
+import math
+import operator
+import queue
+import signal
+import socket
+import struct
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional, Tuple
+import numpy as np
+from aiohttp import ClientSession, TCPConnector
+from aio_georss_client.consts import UPDATE_OK
+from aio_georss_client.geo_rss_distance_helper import GeoRssDistanceHelper
+from aio_georss_client.xml_parser.geometry import Point
 from aio_georss_gdacs import GdacsFeed
+from proto.dispatcher_pb2 import CollectRequest, CollectResponse, FeedEntry
 
+try:
+    import uvloop # libuv-backed event loop; faster accept/read/write path
+except ImportError: # unsupported platform or not installed
+    uvloop = None
+
+# The log file is opened by GdacsCollector.start, so importing this module
+# (e.g. for GdacsClient, or in tests) writes nothing. While serving, the event
+# loop only formats and enqueues records and a listener thread does the file I/O.
+LOG_FILE = "gdacs_collector.log"
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
-file_handler = logging.FileHandler(f"gdacs_collector.log", mode='w', encoding='utf-8')
-file_handler.setFormatter(logging.Formatter('%(asctime)s %(message)s', '%m/%d/%Y %I:%M:%S %p'))
-logger.addHandler(file_handler)
+log_queue = queue.SimpleQueue()
+log_handler = QueueHandler(log_queue)
+
+# Every message is framed as a 4-byte big-endian length followed by the payload.
+FRAME_HEADER = struct.Struct("!I")
+
+# The GDACS feed is global, so one parsed copy serves every (coordinates, radius)
+# query; it is refetched once it is this many seconds old.
+CACHE_TTL = 30
+
+# Mean Earth radius, as used by the haversine package behind the feed library
+EARTH_RADIUS_KM = 6371.0088
+
+# Entries per write when streaming a response
+STREAM_BATCH = 64
+
+# GdacsFeedEntry attributes returned to the dispatcher, read in one C-level call.
+# To send more, extend this getter and the unpacking in `serialize_entries`.
+# Also available: external_id, coordinates, distance_to_home, category,
+# event_type, event_type_short, alert_level, country, event_id, event_name,
+# from_date/to_date (str() them), icon_url, is_current, population, severity,
+# temporary, version, vulnerability.
+_get_entry_fields = operator.attrgetter("title", "description")
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """
+    Read one length-prefixed frame. Raises `asyncio.IncompleteReadError`
+    when the peer closes the connection.
+    """
+    header = await reader.readexactly(FRAME_HEADER.size)
+    return await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+
+
+def write_frame(writer: asyncio.StreamWriter, payload: bytes):
+    """
+    Write `payload` prefixed with its length.
+    """
+    writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def within_radius(entries, geometries, lat, lon, radius):
+    """
+    Return the entries any of whose geometries lie within `radius` km of
+    (lat, lon), as the feed library's `distance_to_home` measures it, in
+    feed order. A radius of 0 returns every entry, with or without a
+    location.
+    `geometries` is built by `GdacsCollector._fetch_entries`: the latitudes
+    and longitudes (radians) of all Point geometries, the cosines of the
+    latitudes and the index of the owning entry, as parallel arrays, plus
+    (entry index, geometry) pairs for polygons and bounding boxes. Points
+    are tested in one vectorized pass; the few shapes go through the
+    library's own distance helper.
+    """
+    if not radius:
+        return list(entries) # no filter
+    lats, lons, cos_lats, owners, shapes = geometries
+    lat0, lon0 = math.radians(lat), math.radians(lon)
+    # d <= radius  <=>  haversine term a <= sin^2(radius / 2R): no arcsin/sqrt per point
+    limit = math.sin(min(radius / (2 * EARTH_RADIUS_KM), math.pi / 2)) ** 2
+    a = np.sin((lats - lat0) / 2) ** 2 + math.cos(lat0) * cos_lats * np.sin((lons - lon0) / 2) ** 2
+    selected = np.zeros(len(entries), dtype=bool)
+    selected[owners[a <= limit]] = True
+    for i, geometry in shapes:
+        if not selected[i] and GeoRssDistanceHelper.distance_to_geometry((lat, lon), geometry) <= radius:
+            selected[i] = True
+    return [entries[i] for i in np.flatnonzero(selected)]
+
+def set_nodelay(writer: asyncio.StreamWriter):
+    """
+    Disable Nagle's algorithm so small response frames go out immediately.
+    """
+    sock = writer.get_extra_info('socket')
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
 
 class GdacsCollector:
     def __init__(self, host, port):
         self.host = host
         self.port = port
+        self.session = None # shared aiohttp session, opened in `start`
+        self._feed: Optional[GdacsFeed] = None # unfiltered global feed, opened in `start`
+        self._raw_cache: Optional[Tuple[float, List, Tuple]] = None # (fetched_at, entries, geometries)
+        self._refresh_lock = asyncio.Lock() # single-flight feed refresh
     
     async def handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """
-        Receive request from dispatcher and sends a response in return. 
+        Receive requests from dispatcher and send a response to each. 
+        Request and response are length-prefixed frames (see `FRAME_HEADER`),
+        so payloads of any size arrive whole, and the connection stays open
+        for further requests until the dispatcher closes it.
         
         Paremeters: 
             reader: Contains request. 
@@ -28,111 +128,224 @@ class GdacsCollector:
             
         """
         dispatcher_addr = writer.get_extra_info('peername')
-        request = await reader.read(4096)
-        if not request:
-            logger.warning(f"No request received from {dispatcher_addr}")
-            writer.close()
-            return
-        
+        set_nodelay(writer)
+        writer.transport.set_write_buffer_limits(0) # drain() waits for the kernel, not a local buffer
+        served = 0
         try:
-            request = json.loads(request.decode('utf-8')) # from json to dict
-            response = await self.collect(request) # list of GdacsFeedEntry objects
-            
-            """ 
-            `json.dump` cannot serialize objects. 
-            `GdacsFeedEntry` objects in `response` must be 
-            converted to a serializable type, e.g., `Dict`. 
-            """
-            serializable_reponse = self.serialize_entries(response)
-                       
-            writer.write(json.dumps(serializable_reponse).encode('utf-8')) # write response in json
-            await writer.drain() # send 
-        except Exception as e:
-            logger.error(f"Error with handle_request: {str(e)}")
-            response = {"error": str(e)}
-            writer.write(json.dumps(response).encode('utf-8'))
-            await writer.drain()
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except asyncio.IncompleteReadError as e:
+                    if e.partial:
+                        logger.warning("Truncated request from %s", dispatcher_addr)
+                    elif not served:
+                        logger.warning("No request received from %s", dispatcher_addr)
+                    break # dispatcher closed the connection
+                
+                try:
+                    request = CollectRequest.FromString(request)
+                    response = await self.collect(request) # list of GdacsFeedEntry objects
+                    
+                    """ 
+                    `GdacsFeedEntry` objects in `response` must be 
+                    converted to `FeedEntry` messages before they 
+                    can be serialized. 
+                    """
+                    chunks = self.serialize_entries(response)
+                except Exception as e:
+                    logger.error("Error with handle_request: %s", e)
+                    response = CollectResponse(error=str(e))
+                    write_frame(writer, response.SerializeToString())
+                else:
+                    await self.write_entries(writer, chunks) # write CollectResponse
+                await writer.drain() # send 
+                served += 1
+        except ConnectionError as e:
+            logger.warning("Connection to %s lost: %s", dispatcher_addr, e)
         finally:
             writer.close()
     
     def serialize_entries(self, entries):
         """
-        Convert list of GdacsFeedEntry objects to
-        a list of serializable dictionaries.
+        Convert list of GdacsFeedEntry objects to a list of serialized
+        single-entry CollectResponse messages (one bytes object per entry).
         """
         if not isinstance(entries, list):
             logger.warning("gdacs_collector response is not a list. ")
         
-        serializable_entries = []
-        for entry in entries:
-            entry_dict = {
-                "title": entry.title,
-                "description": entry.description,
-                # "external_id": entry.external_id,         # uncomment as needed
-                # "coordinates": entry.coordinates,
-                # "distance_to_home": entry.distance_to_home,
-                # "category": entry.category,
-                # "event_type": entry.event_type,
-                # "event_type_short": entry.event_type_short,
-                # "alert_level": entry.alert_level,
-                # "country": entry.country,
-                # "event_id": entry.event_id,
-                # "event_name": entry.event_name,
-                # "from_date": str(entry.from_date) if entry.from_date else None,
-                # "to_date": str(entry.to_date) if entry.to_date else None,
-                # "icon_url": entry.icon_url,
-                # "is_current": entry.is_current,
-                # "population": entry.population,
-                # "severity": entry.severity,
-                # "temporary": entry.temporary,
-                # "version": entry.version,
-                # "vulnerability": entry.vulnerability
-            }
-            serializable_entries.append(entry_dict)
-        return serializable_entries
+        return [
+            CollectResponse(entries=[FeedEntry(title=title, description=description)]).SerializeToString()
+            for title, description in map(_get_entry_fields, entries)
+        ]
     
-    async def collect(self, request: Dict[str, Any]):
+    async def write_entries(self, writer: asyncio.StreamWriter, chunks):
+        """
+        Stream pre-encoded entries as one framed CollectResponse,
+        `STREAM_BATCH` entries per write, draining between batches so a
+        large response never sits in memory as a second full copy.
+        Concatenated messages parse as one message with the repeated
+        `entries` appended, so no separators are needed.
         """
-        Send HTTP request to GDACS to get relevant data. 
+        writer.write(FRAME_HEADER.pack(sum(map(len, chunks))))
+        for start in range(0, len(chunks), STREAM_BATCH):
+            writer.write(b"".join(chunks[start:start + STREAM_BATCH]))
+            await writer.drain()
+    
+    async def collect(self, request: CollectRequest):
+        """
+        Return the GDACS entries within `radius` km of `coordinates`.
+        All requests share one cached copy of the global feed (see
+        `_entries`), so only the distance filter runs per request.
 
         Parameters: 
             request: Contains coordinates and radius 
 
         Returns: 
-
+            List of GdacsFeedEntry objects. Raises ValueError on an
+            invalid request and RuntimeError on a failed fetch; the caller
+            logs either.
         """
+        coordinates = request.coordinates
+        radius = request.radius
+
+        # proto3 has no "missing"; an unset radius reads as 0 (no filter)
+        if len(coordinates) != 2 or radius < 0:
+            raise ValueError("Invalid request: missing coordinates or radius")
+        
         try:
-            coordinates = request.get('coordinates')
-            radius = request.get('radius')
-
-            if (coordinates is None or radius is None):
-                logger.error("Invalid request: missing coordinates or radius") 
-                return "Invalid request: missing coordinates or radius"
-                                  
-            async with ClientSession() as session:
-                feed = GdacsFeed(
-                    session, 
-                    tuple(coordinates), 
-                    filter_radius=radius
-                )
-                
-                status, entries = await feed.update()
-                return entries               
+            entries, geometries = await self._entries()
         except Exception as e:
-            logger.error(f"Failed to collect information from GDACS: {str(e)}")
-            return {"error": f"Failed to collect information from GDACS: {str(e)}"}
+            raise RuntimeError(f"Failed to collect information from GDACS: {str(e)}") from e
+        lat, lon = coordinates
+        return within_radius(entries, geometries, lat, lon, radius)
     
-    async def start(self):
-        server = await asyncio.start_server(
-            self.handle_request, self.host, self.port)
+    async def _entries(self):
+        """
+        Return the cached (entries, geometries) of the global feed, refetching
+        it once it is older than `CACHE_TTL`. Concurrent callers that find
+        it stale wait on a single refresh instead of each fetching.
+        """
+        hit = self._raw_cache
+        if hit and time.monotonic() - hit[0] < CACHE_TTL:
+            return hit[1], hit[2]
         
-        logger.info(f"Server listening on {self.host}:{self.port}")
-        addr = server.sockets[0].getsockname()
-        logger.info(f'Global Disasters Collector serving on {addr}')
+        async with self._refresh_lock:
+            # Another request may have refreshed the feed while we waited
+            hit = self._raw_cache
+            if hit and time.monotonic() - hit[0] < CACHE_TTL:
+                return hit[1], hit[2]
+            
+            entries, geometries = await self._fetch_entries()
+            self._raw_cache = (time.monotonic(), entries, geometries)
+            return entries, geometries
+    
+    async def _fetch_entries(self):
+        """
+        Fetch and parse the whole GDACS feed once. Returns the entries and
+        their geometries, split into point arrays and other shapes, for
+        `within_radius`.
+        """
+        status, entries = await self._feed.update()
+        if status != UPDATE_OK:
+            raise RuntimeError(f"GDACS feed update failed ({status})")
         
-        async with server:
-            await server.serve_forever()
+        entries = list(entries or ())
+        coords, owners, shapes = [], [], []
+        for i, entry in enumerate(entries):
+            for geometry in entry.geometries or ():
+                if isinstance(geometry, Point):
+                    coords.append((geometry.latitude, geometry.longitude))
+                    owners.append(i)
+                else: # Polygon / BoundingBox
+                    shapes.append((i, geometry))
+        lats, lons = np.radians(np.array(coords, dtype=np.float64).reshape(-1, 2)).T
+        return entries, (lats, lons, np.cos(lats), np.array(owners, dtype=np.intp), shapes)
+    
+    async def start(self):
+        """
+        Open the shared HTTP session and serve requests until cancelled.
+        One session per collector lifetime keeps pooled connections, TLS
+        sessions and DNS lookups alive across `collect` calls; SIGINT and
+        SIGTERM cancel the server so the session is closed cleanly.
+        The log listener runs for the lifetime of the server.
+        """
+        file_handler = logging.FileHandler(LOG_FILE, mode='w', encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter('%(asctime)s %(message)s', '%m/%d/%Y %I:%M:%S %p'))
+        log_listener = QueueListener(log_queue, file_handler)
+        log_listener.start()
+        logger.addHandler(log_handler)
+        self.session = ClientSession(
+            connector=TCPConnector(limit=256, ttl_dns_cache=300, keepalive_timeout=60))
+        # Home coordinates are irrelevant without a radius; filtering is done in `collect`
+        self._feed = GdacsFeed(self.session, (0.0, 0.0))
+        loop = asyncio.get_running_loop()
+        serving = asyncio.current_task()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, serving.cancel)
+            except NotImplementedError: # e.g. Windows event loops
+                pass
+        try:
+            server = await asyncio.start_server(
+                self.handle_request, self.host, self.port,
+                reuse_port=hasattr(socket, "SO_REUSEPORT"))
+            
+            logger.info("Server listening on %s:%s", self.host, self.port)
+            addr = server.sockets[0].getsockname()
+            logger.info('Global Disasters Collector serving on %s', addr)
+            
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            logger.info("Global Disasters Collector shutting down")
+        finally:
+            await self.session.close()
+            self.session = self._feed = None
+            logger.removeHandler(log_handler)
+            log_listener.stop() # flushes queued records
+            file_handler.close()
+
+
+class GdacsClient:
+    """
+    Dispatcher-side connection to a GdacsCollector. One TCP connection is
+    opened lazily and reused for every request, using the same framing.
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock() # one request in flight per connection
+    
+    async def request(self, coordinates, radius):
+        """
+        Send a CollectRequest and return the decoded CollectResponse.
+        """
+        async with self._lock:
+            if self._writer is None or self._writer.is_closing():
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                set_nodelay(self._writer)
+            request = CollectRequest(coordinates=coordinates, radius=radius)
+            try:
+                write_frame(self._writer, request.SerializeToString())
+                await self._writer.drain()
+                return CollectResponse.FromString(await read_frame(self._reader))
+            except BaseException:
+                # Failed or cancelled mid-exchange: the stream may hold part of
+                # this response, so the next request starts on a new connection
+                self._writer.close()
+                self._writer = self._reader = None
+                raise
+    
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = self._reader = None
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
     collector = GdacsCollector("localhost", 8080)
     asyncio.run(collector.start())
@@ -1,18 +1,48 @@
+import urllib.request
 import feedparser
+from lxml import etree
+
+def _findtext(elem, *tags):
+    """
+    Return the text of the first child matching one of `tags` (any namespace).
+    """
+    for tag in tags:
+        text = elem.findtext('{*}' + tag)
+        if text is not None:
+            return text.strip()
+    return None
 
 def fetch_rss_feed(url):
     """
-    Fetch and parse an RSS feed from the given URL.
+    Fetch and parse an RSS/Atom feed from the given URL with lxml, falling
+    back to feedparser's lenient parser on malformed XML.
     Returns a list of entries with title, link, and published date.
+    Raises OSError (e.g. urllib.error.URLError) if the fetch fails.
     """
-    feed = feedparser.parse(url)
+    with urllib.request.urlopen(url, timeout=15) as response:
+        body = response.read()
+    try:
+        root = etree.fromstring(body)
+    except etree.XMLSyntaxError:
+        feed = feedparser.parse(body)
+        return [
+            {
+                'title': entry.get('title', 'No title'),
+                'link': entry.get('link', 'No link'),
+                'published': entry.get('published', 'No date')
+            }
+            for entry in feed.entries
+        ]
     entries = []
 
-    for entry in feed.entries:
+    for entry in root.iter('{*}item', '{*}entry'):
+        link = _findtext(entry, 'link')
+        if not link and entry.find('{*}link') is not None:
+            link = entry.find('{*}link').get('href')  # Atom <link href="..."/>
         item = {
-            'title': entry.get('title', 'No title'),
-            'link': entry.get('link', 'No link'),
-            'published': entry.get('published', 'No date')
+            'title': _findtext(entry, 'title') or 'No title',
+            'link': link or 'No link',
+            'published': _findtext(entry, 'pubDate', 'published', 'updated', 'date') or 'No date'
         }
         entries.append(item)
     
@@ -26,7 +56,11 @@ def main():
 
     for url in rss_urls:
         print(f"\n--- Fetching from: {url} ---")
-        entries = fetch_rss_feed(url)
+        try:
+            entries = fetch_rss_feed(url)
+        except OSError as e:
+            print(f"Failed to fetch {url}: {e}")
+            continue
         print (len(entries))
         for entry in entries:  # Show only the first 5 entries
             print(f"Title: {entry['title']}")
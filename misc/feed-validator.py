@@ -1,57 +1,165 @@
+import asyncio
 import csv
+import io
+from operator import itemgetter
+import aiohttp
 import feedparser
+from lxml import etree
 
 INPUT_FILE = 'feeds/tagged_sources.csv'
 OUTPUT_FILE = 'validated_feeds.csv'
 VERBOSE_ENTRIES_FILE = 'full_text_entries.txt'
 TITLE_ENTRIES_FILE = 'title_entries.txt'
-
-def validate_feed(url):
+FETCH_TIMEOUT = 15
+MAX_CONNECTIONS = 32
+OUTPUT_FIELDS = ('Region', 'Tags', 'Source', 'URL', 'Status', 'Feed Title', 'Entries', 'Error')
+_result_fields = itemgetter('status', 'title', 'entries', 'error')
+
+def _findtext(elem, *tags):
+    """
+    Return the text of the first child matching one of `tags` (any namespace).
+    """
+    for tag in tags:
+        text = elem.findtext('{*}' + tag)
+        if text is not None:
+            return text.strip()
+    return None
+
+def _entry_fields(item):
+    """
+    Extract title/link/published/summary from an RSS <item> or Atom <entry>
+    (missing values are omitted).
+    """
+    entry = {
+        'title': _findtext(item, 'title'),
+        'link': _findtext(item, 'link'),
+        'published': _findtext(item, 'pubDate', 'published', 'updated', 'date'),
+        'summary': _findtext(item, 'description', 'summary', 'content'),
+    }
+    if not entry['link']:
+        # Atom carries the URL in <link href="..."/>
+        link = item.find('{*}link')
+        if link is not None:
+            entry['link'] = link.get('href')
+    return {k: v for k, v in entry.items() if v is not None}
+
+def iter_entries(source, feed):
+    """
+    Stream entries out of an RSS 0.9x/1.0/2.0 or Atom document with
+    lxml.iterparse. The feed title is stored in feed['title'] when seen and
+    feed['entries'] counts the entries yielded so far. Each item is freed
+    once yielded, so only one entry is held in memory at a time.
+    Raises etree.XMLSyntaxError on malformed XML.
+    """
+    for _, elem in etree.iterparse(source, tag=('{*}title', '{*}item', '{*}entry')):
+        if etree.QName(elem).localname == 'title':
+            # Item titles are read with their item; only keep the feed's own
+            if etree.QName(elem.getparent()).localname in ('channel', 'feed'):
+                feed['title'] = (elem.text or '').strip()
+            continue
+
+        feed['entries'] += 1
+        yield _entry_fields(elem)
+
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+def write_entries(entries, feed, f, g):
+    """
+    Append each entry to the verbose file `f` and its title to `g`. Text is
+    buffered and written with one write() per file, including whatever was
+    read before `entries` raised part-way.
+    """
+    verbose, titles = [], []
     try:
-        feed = feedparser.parse(url)
-
-        if feed.bozo:
-            return {
-                'status': 'Parse Error',
-                'title': feed.feed.get('title', ''),
-                'entries': len(feed.entries),
-                'error': str(feed.bozo_exception)
-            }
-        elif not feed.entries:
+        for entry in entries:
+            if not verbose:
+                verbose.append(f"=== FEED START ===\nSource: {feed['title']}\n")
+
+            title = entry.get('title', 'No Title')
+            published = entry.get('published', 'No Date')
+            summary = entry.get('summary', 'No Summary')
+
+            verbose.append(
+                "=== ENTRY START ===\n"
+                f"Title    : {title}\n"
+                f"Published: {published}\n"
+                f"Summary  :\n{summary}\n"
+                "=== ENTRY END ===\n\n"
+            )
+            titles.append(f"{title}\n")
+    finally:
+        f.write(''.join(verbose))
+        g.write(''.join(titles))
+
+async def fetch(session, url):
+    """
+    Download the raw feed document at `url`.
+    """
+    timeout = aiohttp.ClientTimeout(total=FETCH_TIMEOUT)
+    async with session.get(url, timeout=timeout) as response:
+        response.raise_for_status()
+        return await response.read()
+
+async def fetch_all(urls):
+    """
+    Fetch every feed concurrently over one shared session. Results are in
+    `urls` order; a failed fetch yields its exception instead of a body.
+    """
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(
+            *(fetch(session, url) for url in urls), return_exceptions=True
+        )
+
+def validate_feed(body, f, g):
+    """
+    Parse a fetched feed document (or the exception its fetch raised),
+    append its entries to the open verbose/title files `f` and `g`, and
+    report its status.
+    """
+    try:
+        if isinstance(body, BaseException):
+            raise body
+
+        feed = {'title': '', 'entries': 0}
+        try:
+            write_entries(iter_entries(io.BytesIO(body), feed), feed, f, g)
+        except etree.XMLSyntaxError as e:
+            if feed['entries']:
+                # Broke part-way through; what was parsed is already written
+                return {
+                    'status': 'Parse Error',
+                    'title': feed['title'],
+                    'entries': feed['entries'],
+                    'error': str(e)
+                }
+            # Malformed XML: let feedparser's lenient parser decide and report why
+            parsed = feedparser.parse(body)
+            if parsed.bozo:
+                return {
+                    'status': 'Parse Error',
+                    'title': parsed.feed.get('title', ''),
+                    'entries': len(parsed.entries),
+                    'error': str(parsed.bozo_exception)
+                }
+            feed = {'title': parsed.feed.get('title', ''), 'entries': len(parsed.entries)}
+            write_entries(parsed.entries, feed, f, g)
+
+        if not feed['entries']:
             return {
                 'status': 'No Entries',
-                'title': feed.feed.get('title', ''),
+                'title': feed['title'],
                 'entries': 0,
                 'error': ''
             }
-        else:
-
-            with open(VERBOSE_ENTRIES_FILE, 'a', encoding='utf-8') as f:
-                f.write("=== FEED START ===\n")
-                f.write(f"Source: {feed.feed.get('title', '')}\n")
-
-                for entry in feed.entries:
-                    title = entry.get('title', 'No Title')
-                    published = entry.get('published', 'No Date')
-                    summary = entry.get('summary', 'No Summary')
-
-                    f.write("=== ENTRY START ===\n")
-                    f.write(f"Title    : {title}\n")
-                    f.write(f"Published: {published}\n")
-                    f.write(f"Summary  :\n{summary}\n")
-                    f.write("=== ENTRY END ===\n\n")
-
-                    with open(TITLE_ENTRIES_FILE, 'a', encoding='utf-8') as g:
-                        g.write(f"{title}\n")
-
-                
-
-            return {
-                'status': 'OK',
-                'title': feed.feed.get('title', ''),
-                'entries': len(feed.entries),
-                'error': ''
-            }
+        return {
+            'status': 'OK',
+            'title': feed['title'],
+            'entries': feed['entries'],
+            'error': ''
+        }
 
     except Exception as e:
         return {
@@ -62,33 +170,22 @@ def validate_feed(url):
         }
 
 def main():
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+    with open(INPUT_FILE, 'r', encoding='utf-8', newline='') as f:
         reader = csv.reader(f)
-        rows = list(reader)
-
-    header = rows[0]
-    data_rows = rows[1:]
-
-    results = []
-    for region, tags, name, url in data_rows:
-        result = validate_feed(url)
-        results.append({
-            'Region': region,
-            'Tags': tags,
-            'Source': name,
-            'URL': url,
-            'Status': result['status'],
-            'Feed Title': result['title'],
-            'Entries': result['entries'],
-            'Error': result['error']
-        })
-
-    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'Region', 'Tags', 'Source', 'URL', 'Status', 'Feed Title', 'Entries', 'Error'
-        ])
-        writer.writeheader()
-        writer.writerows(results)
+        next(reader) # header
+        data_rows = [tuple(row) for row in reader]
+
+    bodies = asyncio.run(fetch_all([row[3] for row in data_rows]))
+
+    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as out, \
+            open(VERBOSE_ENTRIES_FILE, 'a', encoding='utf-8') as f, \
+            open(TITLE_ENTRIES_FILE, 'a', encoding='utf-8') as g:
+        writer = csv.writer(out)
+        writer.writerow(OUTPUT_FIELDS)
+        writer.writerows(
+            row + _result_fields(validate_feed(body, f, g))
+            for row, body in zip(data_rows, bodies)
+        )
 
     print(f"✅ Validation complete. Results written to: {OUTPUT_FILE}")
 
@@ -0,0 +1,2 @@
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: wall-clock or I/O-bound test; deselect with -m 'not slow'")
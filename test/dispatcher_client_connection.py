@@ -2,10 +2,14 @@
 #minimal implementation of dispatcher to test client connection functionality (all dummy replies)
 
 import grpc
+import asyncio
 import datetime
-import traceback
+import inspect
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from google.protobuf.timestamp_pb2 import Timestamp
-from concurrent import futures
 
 from proto.dispatcher_pb2 import (
     RegisterResponse, LoginResponse, TaskStartResponse, TaskResult, ListCategoriesResponse, ListLocationsResponse
@@ -15,62 +19,101 @@ from proto.dispatcher_pb2_grpc import (
     ClientDispatcherServicer, add_ClientDispatcherServicer_to_server
 )
 
+# TaskResult has no title/url fields; dummy payloads travel JSON-encoded in
+# `result`, with the keys the client's display_single_result reads
+_URL = "https://www.google.com"
+
+log = logging.getLogger(__name__)
+_RESULTS = tuple({"title": f"Task {i}", "link": _URL, "source": "dummy"} for i in range(1, 6))
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+def _rpc_failed(name, context, e):
+    log.exception("RPC %s failed", name)
+    context.set_details(str(e))
+    context.set_code(grpc.StatusCode.INTERNAL)
+
 def grpc_safe(f):
-    def wrapper(self, request, context):
+    if inspect.isasyncgenfunction(f): # server-streaming RPC
+        async def wrapper(self, request, context):
+            try:
+                async for response in f(self, request, context):
+                    yield response
+            except Exception as e:
+                _rpc_failed(f.__name__, context, e)
+        return wrapper
+    async def wrapper(self, request, context):
         try:
-            return f(self, request, context)
+            return await f(self, request, context)
         except Exception as e:
-            print(f"[ERROR] Exception in {f.__name__}: {e}")
-            traceback.print_exc()
-            context.set_details(str(e))
-            context.set_code(grpc.StatusCode.INTERNAL)
+            _rpc_failed(f.__name__, context, e)
             return None
     return wrapper
 
 class DispatcherService(ClientDispatcherServicer):
     @grpc_safe
-    def Register(self, request, context):
-        print(f"Registering client: {request.username}")
+    async def Register(self, request, context):
+        log.debug("Registering client: %s", request.username)
         return RegisterResponse(success=True, message="Registration successful", user_id = request.username)
     
     @grpc_safe
-    def Login(self, request, context):
-        print(f"Logging in client: {request.username}")
+    async def Login(self, request, context):
+        log.debug("Logging in client: %s", request.username)
         return LoginResponse(success=True, message="Login successful", token = "1234567890")
     
     @grpc_safe
-    def StartTask(self, request, context):
-        print(f"Starting task for user token: {request.token} \n Keywords: {request.keywords}, Categories: {request.categories}, Location: {request.location}, Start Time: {request.start_time.seconds}, End Time: {request.end_time.seconds}")
+    async def StartTask(self, request, context):
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Starting task for user token: %s \n Keywords: %s, Categories: %s, Location: %s, Start Time: %s, End Time: %s",
+                      request.token, request.keywords, request.categories, request.location,
+                      request.start_time.seconds, request.end_time.seconds)
         return TaskStartResponse(success=True, message="Task started", task_id = f"{request.token} {request.start_time}" )
     
     @grpc_safe
-    def StreamResults(self, request, context):
-        print(f"Result stream for task: {request.task_id}")
+    async def StreamResults(self, request, context):
+        log.debug("Result stream for task: %s", request.task_id)
+        now = datetime.datetime.now(datetime.timezone.utc)  # Use current time
         ts = Timestamp()
-        ts.FromDatetime(datetime.datetime.now(datetime.timezone.utc))  # Use current time
-        yield TaskResult(task_id = request.task_id, title = "Task 1", url = "https://www.google.com", timestamp = ts)
-        yield TaskResult(task_id = request.task_id, title = "Task 2", url = "https://www.google.com", timestamp = ts)
-        yield TaskResult(task_id = request.task_id, title = "Task 3", url = "https://www.google.com", timestamp = ts)
-        yield TaskResult(task_id = request.task_id, title = "Task 4", url = "https://www.google.com", timestamp = ts)
-        yield TaskResult(task_id = request.task_id, title = "Task 5", url = "https://www.google.com", timestamp = ts)
+        ts.FromDatetime(now)
+        base = TaskResult(task_id = request.task_id, timestamp = ts)  # fields shared by every result
+        shared = {"task_id": request.task_id, "published": now.isoformat()}
+        for result in _RESULTS:
+            msg = TaskResult()
+            msg.CopyFrom(base)
+            msg.result = json.dumps({**shared, **result})
+            yield msg
 
     @grpc_safe
-    def ListAvailableCategories(self, request, context):
-        print("Listing available categories")
+    async def ListAvailableCategories(self, request, context):
+        log.debug("Listing available categories")
         return ListCategoriesResponse(categories = ["Category 1", "Category 2", "Category 3"])
 
     @grpc_safe
-    def ListAvailableLocations(self, request, context):
-        print("Listing available locations")
+    async def ListAvailableLocations(self, request, context):
+        log.debug("Listing available locations")
         return ListLocationsResponse(locations = ["Location 1", "Location 2", "Location 3"])
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+async def serve():
+    # The event loop only enqueues log records; the listener thread writes them out
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+    listener.start()
+
+    server = grpc.aio.server()
     add_ClientDispatcherServicer_to_server(DispatcherService(), server)
     server.add_insecure_port('[::]:50051')
-    server.start()
-    print("Dispatcher server started on port 50051")
-    server.wait_for_termination()
+    await server.start()
+    log.info("Dispatcher server started on port 50051")
+    try:
+        await server.wait_for_termination()
+    finally:
+        listener.stop()
 
 if __name__ == '__main__':
-    serve()
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.install()
+    asyncio.run(serve())
\ No newline at end of file
@@ -31,8 +31,8 @@ def test_task_assignment_and_expiry(cm):
 
     # assign one task, short expiry
     end = time.time() + 0.1
-    ok, _ = cm.assign_task_balanced("taskX", ["src1"], end)
-    assert ok
+    assigned, failed = cm.assign_task_balanced("taskX", ["src1"], end, max_idle=60)
+    assert assigned == ["src1"] and failed == []
 
     # wait for expiry
     time.sleep(0.2)
@@ -47,3 +47,41 @@ def test_task_assignment_and_expiry(cm):
     # after purge, task no longer tracked
     assert not cm.has_task_expired("taskX")
 
+def test_idle_queue_join_and_pop(cm):
+    cm.register_collector("idle1", "s1")
+    cm.register_collector("busy1", "s2")
+    ok, tok_idle, _ = cm.login_collector("idle1", "s1")
+    ok, tok_busy, _ = cm.login_collector("busy1", "s2")
+
+    # repeated idle heartbeats queue a collector only once
+    cm.heartbeat(tok_idle, idle=True)
+    cm.heartbeat(tok_idle, idle=True)
+    cm.heartbeat(tok_busy, idle=True)
+
+    # a collector that picked up work since reporting idle is skipped
+    cm.assign_task_to_collector(tok_busy, "taskB", ["src1"], time.time() + 60)
+
+    # FIFO: first idle collector is handed out first
+    info = cm.pop_idle_collector(max_idle=60)
+    assert info is not None and info.name == "idle1"
+
+    # queue drained (busy collector dropped as stale)
+    assert cm.pop_idle_collector(max_idle=60) is None
+
+def test_assign_task_balanced_batches_sources(cm):
+    end = time.time() + 60
+    # no live collectors: everything fails
+    assigned, failed = cm.assign_task_balanced("t0", ["s1", "s2"], end, max_idle=60)
+    assert assigned == [] and failed == ["s1", "s2"]
+
+    cm.register_collector("idle1", "s1")
+    cm.register_collector("other", "s2")
+    ok, tok_idle, _ = cm.login_collector("idle1", "s1")
+    cm.login_collector("other", "s2")
+    cm.heartbeat(tok_idle, idle=True)
+
+    assigned, failed = cm.assign_task_balanced("t1", ["a", "b", "c"], end, max_idle=60)
+    assert assigned == ["a", "b", "c"] and failed == []
+    # idle collector takes one source, the rest go in one batch
+    assert cm.get_collector_info("idle1").get_tasks()["t1"]["sources"] == ["a"]
+    assert cm.get_collector_info("other").get_tasks()["t1"]["sources"] == ["b", "c"]
@@ -0,0 +1,194 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import random
+
+import pytest
+from aio_georss_client.consts import UPDATE_OK
+from aio_georss_client.geo_rss_distance_helper import GeoRssDistanceHelper
+from aio_georss_client.xml_parser.geometry import BoundingBox, Point, Polygon
+from haversine import haversine
+
+import gdacs_collector
+from gdacs_collector import (
+    FRAME_HEADER, STREAM_BATCH, GdacsClient, GdacsCollector, read_frame, within_radius, write_frame
+)
+
+class FakeEntry:
+    """Stands in for GdacsFeedEntry: geometries plus the serialized fields."""
+    def __init__(self, title, geometries=()):
+        self.title = title
+        self.description = f"about {title}"
+        self.geometries = list(geometries)
+
+class FakeFeed:
+    """Stands in for GdacsFeed; counts fetches."""
+    def __init__(self, entries, delay=0):
+        self.entries = entries
+        self.delay = delay
+        self.updates = 0
+
+    async def update(self):
+        self.updates += 1
+        await asyncio.sleep(self.delay)
+        return UPDATE_OK, self.entries
+
+def make_collector(entries, delay=0):
+    collector = GdacsCollector("127.0.0.1", 0)
+    collector._feed = FakeFeed(entries, delay)
+    return collector
+
+def square(lat, lon, d):
+    corners = [(lat - d, lon - d), (lat - d, lon + d), (lat + d, lon + d), (lat + d, lon - d), (lat - d, lon - d)]
+    return Polygon([Point(*c) for c in corners])
+
+def library_filter(entries, lat, lon, radius):
+    # GeoRssFeed's own radius filter: distance_to_home is the minimum over all geometries
+    return [
+        e for e in entries
+        if min((GeoRssDistanceHelper.distance_to_geometry((lat, lon), g) for g in e.geometries),
+               default=float("inf")) <= radius
+    ]
+
+def test_frame_round_trip():
+    async def run():
+        reader = asyncio.StreamReader()
+        for payload in (b"", b"x", b"y" * 100000):
+            reader.feed_data(FRAME_HEADER.pack(len(payload)) + payload)
+        reader.feed_data(FRAME_HEADER.pack(10) + b"short")
+        reader.feed_eof()
+        assert await read_frame(reader) == b""
+        assert await read_frame(reader) == b"x"
+        assert await read_frame(reader) == b"y" * 100000
+        with pytest.raises(asyncio.IncompleteReadError) as e:
+            await read_frame(reader)
+        assert e.value.partial == b"short"
+
+        class Sink:
+            data = b""
+            def write(self, chunk):
+                self.data += chunk
+        sink = Sink()
+        write_frame(sink, b"payload")
+        assert sink.data == FRAME_HEADER.pack(7) + b"payload"
+    asyncio.run(run())
+
+def test_collect_over_loopback():
+    # More entries than one write batch, so the response spans several writes
+    n = 2 * STREAM_BATCH + 5
+    entries = [FakeEntry(f"event {i}", [Point(0.0, i * 0.001)]) for i in range(n)]
+    entries.append(FakeEntry("far away", [Point(45.0, 90.0)]))
+    collector = make_collector(entries)
+
+    async def run():
+        server = await asyncio.start_server(collector.handle_request, "127.0.0.1", 0)
+        client = GdacsClient("127.0.0.1", server.sockets[0].getsockname()[1])
+        try:
+            response = await client.request([0.0, 0.0], 1000)
+            assert response.error == ""
+            assert [e.title for e in response.entries] == [f"event {i}" for i in range(n)]
+            assert response.entries[3].description == "about event 3"
+            # Same connection serves further requests, including errors
+            response = await client.request([0.0], 10)
+            assert response.error == "Invalid request: missing coordinates or radius"
+            assert not response.entries
+            response = await client.request([0.0, 0.0], 0)
+            assert len(response.entries) == n + 1
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
+
+def test_entries_single_flight(monkeypatch):
+    collector = make_collector([FakeEntry("quake", [Point(10.0, 10.0)])], delay=0.05)
+
+    async def run():
+        results = await asyncio.gather(*(collector._entries() for _ in range(20)))
+        assert collector._feed.updates == 1
+        assert all(r[0] is results[0][0] for r in results)
+        await collector._entries()
+        assert collector._feed.updates == 1
+        # Once the copy is older than CACHE_TTL, the next caller refetches
+        monkeypatch.setattr(gdacs_collector, "CACHE_TTL", 0)
+        await collector._entries()
+        assert collector._feed.updates == 2
+    asyncio.run(run())
+
+def test_within_radius_matches_library():
+    rng = random.Random(7)
+    def point():
+        return Point(rng.uniform(-70, 70), rng.uniform(-140, 140))
+    entries = []
+    for i in range(200):
+        kind = i % 5
+        if kind == 0:
+            geometries = [point()]
+        elif kind == 1:
+            geometries = [point(), point()]
+        elif kind == 2:
+            # Centre point far from a polygon footprint
+            c = point()
+            geometries = [Point(c.latitude, c.longitude + 30), square(c.latitude, c.longitude, 5)]
+        elif kind == 3:
+            c = point()
+            geometries = [BoundingBox(Point(c.latitude - 3, c.longitude - 3), Point(c.latitude + 3, c.longitude + 3))]
+        else:
+            geometries = []
+        entries.append(FakeEntry(str(i), geometries))
+    collector = make_collector(entries)
+    entries, geometries = asyncio.run(collector._fetch_entries())
+    for _ in range(200):
+        lat, lon = rng.uniform(-70, 70), rng.uniform(-140, 140)
+        radius = rng.choice([50, 500, 2000, 8000, 30000])
+        got = within_radius(entries, geometries, lat, lon, radius)
+        assert got == library_filter(entries, lat, lon, radius)
+
+def test_within_radius_edges():
+    inside = FakeEntry("inside", [Point(0.0, 40.0), square(10.0, 10.0, 1)])
+    near = FakeEntry("near", [Point(1.0, 1.0)])
+    nowhere = FakeEntry("no location")
+    collector = make_collector([inside, near, nowhere])
+    entries, geometries = asyncio.run(collector._fetch_entries())
+    # A polygon covering the query point matches even though its point is far off
+    assert within_radius(entries, geometries, 10.0, 10.0, 1) == [inside]
+    # Cutoff at the haversine distance, to within float error either side
+    d = haversine((0.0, 0.0), (1.0, 1.0))
+    assert within_radius(entries, geometries, 0.0, 0.0, d * (1 + 1e-9)) == [near]
+    assert within_radius(entries, geometries, 0.0, 0.0, d * (1 - 1e-9)) == []
+    # No radius: everything, including entries without a location
+    assert within_radius(entries, geometries, 0.0, 0.0, 0) == [inside, near, nowhere]
+
+def test_client_reconnects_after_broken_response():
+    collector = make_collector([FakeEntry("quake", [Point(0.0, 0.0)])])
+    calls = 0
+
+    async def flaky(reader, writer):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            # Die mid-response: a header promising more bytes than are sent
+            await read_frame(reader)
+            writer.write(FRAME_HEADER.pack(100) + b"partial")
+            await writer.drain()
+            writer.close()
+            return
+        await collector.handle_request(reader, writer)
+
+    async def run():
+        server = await asyncio.start_server(flaky, "127.0.0.1", 0)
+        client = GdacsClient("127.0.0.1", server.sockets[0].getsockname()[1])
+        try:
+            with pytest.raises(asyncio.IncompleteReadError):
+                await client.request([0.0, 0.0], 10)
+            assert client._writer is None
+            response = await client.request([0.0, 0.0], 10)
+            assert [e.title for e in response.entries] == ["quake"]
+            assert calls == 2
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
@@ -2,9 +2,11 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import json
 import pytest
 
 from dispatcher.source_catalog import (
+    load_sources,
     list_available_categories,
     list_available_locations,
     match_sources
@@ -81,3 +83,23 @@ def test_match_sources_no_match():
         sources=FAKE_SOURCES
     )
     assert matched == []
+
+def test_load_sources_is_cached(tmp_path, monkeypatch):
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps(FAKE_SOURCES), encoding="utf-8")
+    first = load_sources(str(path))
+    # relative and absolute spellings share one cached catalog
+    monkeypatch.chdir(tmp_path)
+    assert load_sources("sources.json") is first
+    assert [s["id"] for s in first] == ["source1", "source2", "source3"]
+
+def test_load_sources_reloads_on_change(tmp_path):
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps(FAKE_SOURCES[:1]), encoding="utf-8")
+    assert len(load_sources(str(path))) == 1
+
+    path.write_text(json.dumps(FAKE_SOURCES), encoding="utf-8")
+    # bump mtime explicitly; coarse filesystem clocks may not tick between writes
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert len(load_sources(str(path))) == 3
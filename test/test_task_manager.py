@@ -5,22 +5,42 @@ import json
 import datetime
 from datetime import timedelta
 import tempfile
+import sqlite3
+import threading
+import time
 
 import pytest
-from dispatcher.task_manager import TaskManager
+from dispatcher.task_manager import CONNECTION_PRAGMAS, Status, TaskManager, _list_sql, now_micros
+
+# SQLite's own defaults, i.e. the settings before the PRAGMA tuning
+DEFAULT = {"journal_mode": "DELETE", "synchronous": "FULL"}
+WAL_FAST = CONNECTION_PRAGMAS
+
+@pytest.fixture(scope="module")
+def shared_tm():
+    # One in-memory database for the module: schema and PRAGMAs are set up once
+    tm = TaskManager(db_path=":memory:")
+    yield tm
+    tm.close()
 
 @pytest.fixture
-def temp_db(tmp_path):
+def tm(shared_tm):
+    shared_tm.truncate_all()
+    return shared_tm
+
+@pytest.fixture
+def file_db(tmp_path):
+    # For tests that reopen the database from a second TaskManager
     db = tmp_path / "tasks.db"
     return str(db)
 
-def test_task_lifecycle(temp_db):
-    tm = TaskManager(db_path=temp_db)
+def test_task_lifecycle(tm):
     assert tm.count_tasks() == 0
 
     # Create a task
-    start = datetime.datetime.now(datetime.timezone.utc).isoformat()
-    end   = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)).isoformat()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    start = now.isoformat()
+    end   = (now + timedelta(hours=1)).isoformat()
     tm.create_task(
         task_id="t1",
         token="tok1",
@@ -40,14 +60,14 @@ def test_task_lifecycle(temp_db):
     assert t["status"] == "PENDING"
 
     # Status transitions
-    tm.mark_dispatched("t1")
-    assert tm.get_task("t1")["status"] == "DISPATCHED"
-    tm.mark_completed("t1")
-    assert tm.get_task("t1")["status"] == "COMPLETED"
-    tm.mark_failed("t1")
-    assert tm.get_task("t1")["status"] == "FAILED"
-    tm.cancel_task("t1")
-    assert tm.get_task("t1")["status"] == "CANCELLED"
+    assert tm.mark_dispatched("t1")["status"] == "DISPATCHED"
+    assert tm.mark_completed("t1")["status"] == "COMPLETED"
+    assert tm.mark_failed("t1")["status"] == "FAILED"
+    t = tm.cancel_task("t1")
+    assert t["status"] == "CANCELLED"
+    assert t["categories"] == ["cat1"]
+    assert tm.get_task("t1") == t
+    assert tm.mark_completed("missing") is None
 
     # Listing & filtering
     tm.create_task("t2", "tok1", "kw2", ["cat1"], ["loc1"], start, end)
@@ -56,6 +76,285 @@ def test_task_lifecycle(temp_db):
 
     pendings = tm.list_tasks_by_status(["PENDING"])
     assert all(t["status"] == "PENDING" for t in pendings)
+    open_tasks = tm.list_tasks_by_status(["PENDING", "DISPATCHED"])
+    assert [t["task_id"] for t in open_tasks] == ["t2"]
+    # Each filter shape builds its SQL once
+    hits = _list_sql.cache_info().hits
+    tm.list_tasks_by_status(["PENDING"])
+    tm.list_tasks_by_status(["PENDING", "DISPATCHED"])
+    assert _list_sql.cache_info().hits == hits + 2
 
     by_token = tm.list_tasks(token="tok1")
     assert len(by_token) == 2
+
+    by_category = tm.list_tasks(category="cat1")
+    assert {t["task_id"] for t in by_category} == {"t1", "t2"}
+    assert tm.list_tasks(category="cat2") == []
+
+    # Batch transition
+    tm.create_many([(f"b{i}", "tok2", "kw", ["cat1"], ["loc1"], start, end) for i in range(100)])
+    tm.mark_many([f"b{i}" for i in range(100)], "COMPLETED")
+    completed = tm.list_tasks_by_status(["COMPLETED"])
+    assert len(completed) == 100
+    assert {t["task_id"] for t in completed} == {f"b{i}" for i in range(100)}
+
+def test_connection_pragmas(file_db):
+    tm = TaskManager(db_path=file_db)
+    assert tm._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert tm._conn.execute("PRAGMA synchronous").fetchone()[0] == 1 # NORMAL
+    assert tm._conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert tm._conn.execute("PRAGMA mmap_size").fetchone()[0] == 268435456
+    assert tm._conn.execute("PRAGMA cache_size").fetchone()[0] == -20000
+    # Per-connection settings are applied again on a second instance
+    other = TaskManager(db_path=file_db)
+    assert other._conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert other._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    other.close()
+    tm.close()
+
+def test_wal_after_file_recreated(file_db):
+    TaskManager(db_path=file_db).close()
+    os.remove(file_db)
+    tm = TaskManager(db_path=file_db)
+    assert tm._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    tm.close()
+
+def test_single_connection_persists(file_db):
+    tm = TaskManager(db_path=file_db)
+    conn = tm._conn
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    tm.create_task("t1", "tok1", "kw1", ["cat1"], ["loc1"], now, now)
+    tm.mark_completed("t1")
+    assert tm._conn is conn
+    # Autocommit: writes are visible to an independent connection
+    other = TaskManager(db_path=file_db)
+    assert other.get_task("t1")["status"] == "COMPLETED"
+    other.close()
+    tm.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        tm.count_tasks()
+
+def test_task_lifecycle_batched(file_db):
+    tm = TaskManager(db_path=file_db)
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    with tm.transaction():
+        tm.create_task("t1", "tok1", "kw1", ["cat1"], ["loc1"], now, now)
+        tm.mark_dispatched("t1")
+        assert tm.get_task("t1")["status"] == "DISPATCHED"
+        tm.mark_completed("t1")
+        tm.create_task("t2", "tok1", "kw2", ["cat1"], ["loc1"], now, now)
+        assert tm._conn.in_transaction
+    assert not tm._conn.in_transaction
+    other = TaskManager(db_path=file_db)
+    assert other.get_task("t1")["status"] == "COMPLETED"
+    assert other.count_tasks() == 2
+    other.close()
+
+    with pytest.raises(RuntimeError):
+        with tm.transaction():
+            tm.mark_failed("t1")
+            raise RuntimeError("abort")
+    assert tm.get_task("t1")["status"] == "COMPLETED"
+    tm.close()
+
+def test_create_many(tm):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    tm.create_many([(f"t{i}", "tok1", "kw", ["cat1", "cat2"], ["loc1"], now, now) for i in range(1000)])
+    assert tm.count_tasks() == 1000
+    assert tm.count_tasks(["PENDING"]) == 1000
+    t = tm.get_task("t999")
+    assert t["categories"] == ["cat1", "cat2"]
+    assert t["locations"] == ["loc1"]
+
+def test_concurrent_reads(file_db):
+    tm = TaskManager(db_path=file_db)
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    ids = [f"t{i}" for i in range(200)]
+    tm.create_many([(i, "tok1", "kw", ["cat1"], ["loc1"], now, now) for i in ids])
+
+    errors = []
+    def reader():
+        try:
+            for _ in range(50):
+                assert len(tm.list_tasks()) == 200
+                assert tm.get_task("t0") is not None
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for status in ("DISPATCHED", "COMPLETED", "FAILED") * 5:
+        tm.mark_many(ids, status)
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert tm.count_tasks(["FAILED"]) == 200
+    tm.close()
+
+def test_list_filters_use_indexes(tm):
+    # The exact SQL list_tasks runs for a status filter and a token filter
+    plan = tm._conn.execute(
+        "EXPLAIN QUERY PLAN " + _list_sql(False, False, 1, False, False, False), (Status.PENDING.value,)
+    ).fetchall()
+    assert any("idx_tasks_status" in r[3] for r in plan)
+    plan = tm._conn.execute(
+        "EXPLAIN QUERY PLAN " + _list_sql(True, False, 0, False, False, False), ("tok1",)
+    ).fetchall()
+    assert any("idx_tasks_token" in r[3] for r in plan)
+
+def test_indexes_added_to_existing_db(file_db):
+    conn = sqlite3.connect(file_db)
+    conn.execute("CREATE TABLE tasks (task_id TEXT PRIMARY KEY, token TEXT NOT NULL, keywords TEXT NOT NULL, "
+                 "categories TEXT NOT NULL, locations TEXT NOT NULL, start_time TEXT NOT NULL, "
+                 "end_time TEXT NOT NULL, status TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+    tm = TaskManager(db_path=file_db)
+    names = {r[0] for r in tm._conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_tasks_status", "idx_tasks_token"} <= names
+    tm.close()
+
+def test_shared_now_timestamp(tm):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    tm.create_task("t1", "tok1", "kw1", ["cat1"], ["loc1"], now, now, now=now)
+    tm.mark_dispatched("t1", now)
+    t = tm.get_task("t1")
+    assert t["status"] == "DISPATCHED"
+    assert t["created_at"] == t["updated_at"] == now
+
+def test_complete_expired(tm):
+    now = now_micros()
+    past, future = now - 1_000_000, now + 1_000_000
+    tm.create_many([("old", "tok1", "kw", [], [], past, past),
+                    ("new", "tok1", "kw", [], [], past, future),
+                    ("done", "tok1", "kw", [], [], past, past)], now)
+    tm.mark_dispatched("old", now)
+    tm.mark_failed("done", now)
+    assert tm.complete_expired(now) == ["old"]
+    assert tm.get_task("old")["status"] == "COMPLETED"
+    assert tm.get_task("new")["status"] == "PENDING"
+    assert tm.get_task("done")["status"] == "FAILED"
+    assert tm.complete_expired(now) == []
+
+def test_categories_locations_round_trip(tm):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    tm.create_task("t1", "tok1", "kw1", ["cat1", "cat two"], [], now, now)
+    t = tm.get_task("t1")
+    assert t["categories"] == ["cat1", "cat two"]
+    assert t["locations"] == []
+    assert [t["task_id"] for t in tm.list_tasks(category="cat two")] == ["t1"]
+    # Free-text tags that look like JSON stay text
+    tm.create_task("t2", "tok1", "kw1", ["[Breaking]", "general"], ["[1]"], now, now)
+    t = tm.get_task("t2")
+    assert t["categories"] == ["[Breaking]", "general"]
+    assert t["locations"] == ["[1]"]
+    assert [t["task_id"] for t in tm.list_tasks(category="[Breaking]")] == ["t2"]
+
+def test_times_stored_as_micros(tm):
+    start = datetime.datetime(2025, 1, 1, 12, 0, 0, 5, tzinfo=datetime.timezone.utc)
+    tm.create_task("t1", "tok1", "kw1", [], [], start, start + timedelta(hours=1))
+    tm.create_task("t2", "tok1", "kw1", [], [], (start + timedelta(days=1)).isoformat(), start + timedelta(days=2))
+    stored = tm._conn.execute("SELECT start_time, typeof(created_at) FROM tasks WHERE task_id = 't1'").fetchone()
+    assert stored == (int(start.timestamp()) * 1_000_000 + 5, "integer")
+    t = tm.get_task("t1")
+    assert t["start_time"] == start.isoformat()
+    assert t["end_time"] == (start + timedelta(hours=1)).isoformat()
+    in_range = tm.list_tasks(time_range=(start.isoformat(), start + timedelta(hours=12)))
+    assert [t["task_id"] for t in in_range] == ["t1"]
+
+def test_legacy_iso_times_migrated(file_db):
+    conn = sqlite3.connect(file_db)
+    conn.execute("CREATE TABLE tasks (task_id TEXT PRIMARY KEY, token TEXT NOT NULL, keywords TEXT NOT NULL, "
+                 "categories TEXT NOT NULL, locations TEXT NOT NULL, start_time TEXT NOT NULL, "
+                 "end_time TEXT NOT NULL, status TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)")
+    iso = "2025-04-29T17:10:32.512786+00:00"
+    conn.execute("INSERT INTO tasks VALUES ('t1', 'tok1', '', '[\"general\"]', '[]', ?, ?, 'COMPLETED', ?, ?)",
+                 (iso, iso, iso, iso))
+    conn.commit()
+    conn.close()
+    tm = TaskManager(db_path=file_db)
+    t = tm.get_task("t1")
+    assert t["start_time"] == t["updated_at"] == iso
+    assert t["categories"] == ["general"] and t["status"] == "COMPLETED"
+    assert tm._conn.execute("SELECT typeof(start_time), status FROM tasks").fetchone() == ("integer", 2)
+    assert [t["task_id"] for t in tm.list_tasks(category="general")] == ["t1"]
+    tm.close()
+
+def test_categories_backfilled_for_existing_db(file_db):
+    tm = TaskManager(db_path=file_db)
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    tm.create_task("t1", "tok1", "kw1", ["cat1", "cat2"], [], now, now)
+    # As written before task_categories (and its schema version) existed
+    tm._conn.execute("DROP TABLE task_categories")
+    tm._conn.execute("PRAGMA user_version = 2")
+    tm.close()
+    tm = TaskManager(db_path=file_db)
+    assert [t["task_id"] for t in tm.list_tasks(category="cat2")] == ["t1"]
+    tm.close()
+
+def test_tables_without_rowid(file_db):
+    conn = sqlite3.connect(file_db)
+    conn.execute("CREATE TABLE tasks (task_id TEXT PRIMARY KEY, token TEXT NOT NULL, keywords TEXT NOT NULL, "
+                 "categories TEXT NOT NULL, locations TEXT NOT NULL, start_time INTEGER NOT NULL, "
+                 "end_time INTEGER NOT NULL, status TEXT NOT NULL, created_at INTEGER NOT NULL, updated_at INTEGER NOT NULL)")
+    conn.execute("CREATE TABLE task_categories (task_id TEXT NOT NULL, cat TEXT NOT NULL, PRIMARY KEY (task_id, cat))")
+    conn.execute("INSERT INTO tasks VALUES ('t1', 'tok1', '', '[\"general\"]', '[]', 1, 2, 'PENDING', 3, 4)")
+    conn.execute("INSERT INTO task_categories VALUES ('t1', 'general')")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+    tm = TaskManager(db_path=file_db)
+    for name, sql in tm._conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'"):
+        assert "WITHOUT ROWID" in sql, name
+    plan = tm._conn.execute("EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE task_id = ?", ("t1",)).fetchall()
+    assert "USING PRIMARY KEY" in plan[0][3]
+    assert tm.get_task("t1")["status"] == "PENDING"
+    assert [t["task_id"] for t in tm.list_tasks(category="general")] == ["t1"]
+    # Legacy JSON list columns are repacked, so reads only split
+    assert tm._conn.execute("SELECT categories, locations FROM tasks").fetchone() == ("general", "")
+    tm.close()
+
+def _lifecycle_workload(tm, n=200):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    for i in range(n):
+        tm.create_task(f"t{i}", "tok1", "kw", ["cat1"], ["loc1"], now, now)
+    for i in range(n):
+        assert tm.mark_dispatched(f"t{i}")["status"] == "DISPATCHED"
+        tm.get_task(f"t{i}")
+    assert len(tm.list_tasks_by_status(["DISPATCHED"])) == n
+
+def _timed_workload(path, pragmas):
+    tm = TaskManager(db_path=path, pragmas=pragmas)
+    t0 = time.perf_counter()
+    _lifecycle_workload(tm)
+    elapsed = time.perf_counter() - t0
+    tm.close()
+    return elapsed
+
+@pytest.mark.slow # wall-clock comparison, fsync-bound on the DEFAULT side
+def test_pragma_tuning_faster(tmp_path):
+    elapsed_wal = _timed_workload(str(tmp_path / "tuned.db"), WAL_FAST)
+    elapsed_default = _timed_workload(str(tmp_path / "default.db"), DEFAULT)
+    # Loose bound so timer noise never fails it: the tuned settings must not
+    # fall far behind SQLite's defaults (they run several times faster)
+    assert elapsed_wal < 2 * elapsed_default
+
+def test_status_stored_as_code(tm):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    tm.create_many([(f"t{i}", "tok1", "kw", [], [], now, now) for i in range(3)], now)
+    tm.mark_many(["t0", "t1"], "DISPATCHED", now)
+    tm.update_status("t1", Status.FAILED)
+    assert tm._conn.execute("SELECT task_id, status FROM tasks ORDER BY task_id").fetchall() == [
+        ("t0", Status.DISPATCHED), ("t1", Status.FAILED), ("t2", Status.PENDING)]
+    assert tm.get_task("t1")["status"] == "FAILED"
+    assert [t["task_id"] for t in tm.list_pending_or_dispatched()] == ["t0", "t2"]
+    assert tm.count_tasks(["FAILED", Status.PENDING]) == 2
+    with pytest.raises(ValueError, match="unknown status 'DONE'"):
+        tm.mark_many(["t0"], "DONE")
+    with pytest.raises(ValueError, match="unknown status 'done'"):
+        tm.update_status("t0", "done")
+    with pytest.raises(ValueError):
+        tm.list_tasks_by_status([99])
+    assert tm.get_task("t0")["status"] == "DISPATCHED"